@@ -0,0 +1,284 @@
+"""
+Bulk import of GO Competition Challenge 2 bundles into AMS UC cases.
+
+A bundle holds, per scenario, the network in ``case.raw``, the market data
+in ``case.json``, and the contingencies in ``case.con``.
+"""
+
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+import ams
+
+logger = logging.getLogger(__name__)
+
+
+def _gen_key(bus, gid):
+    """
+    Key of a generator by bus number and generator id.
+
+    Ids are compared as integers where possible, since the RAW parser and
+    the JSON file spell them differently, e.g., ``1`` and ``'1 '``.
+    """
+    gid = str(gid).strip().strip("'").strip()
+    try:
+        gid = int(gid)
+    except ValueError:
+        pass
+    return int(bus), gid
+
+
+def scan_load(raw):
+    """
+    Total active power of the loads in a RAW file.
+
+    Only the load section is parsed, line by line, so the rest of the file
+    costs a string comparison per line. Constant current and constant
+    admittance loads are counted at 1 p.u. voltage.
+
+    Parameters
+    ----------
+    raw : str
+        Path to the PSS/E RAW file.
+
+    Returns
+    -------
+    float
+        Total load, MW.
+    """
+    total = 0.0
+    in_load = False
+    with open(raw, 'r') as f:
+        for line in f:
+            if not in_load:
+                in_load = 'BEGIN LOAD DATA' in line
+                continue
+            head = line.strip()
+            if head == '0' or head.startswith(('0 ', '0/', 'Q')):
+                break
+            fields = line.split(',')
+            total += float(fields[5]) + float(fields[7]) + float(fields[9])
+    if not in_load:
+        logger.warning(f'No load section found in <{raw}>.')
+    return total
+
+
+def load_factors(cases):
+    """
+    Load factors of scenarios, as the total load of each scenario divided by
+    the largest one.
+
+    Parameters
+    ----------
+    cases : list of str
+        Paths to the RAW files of the scenarios.
+
+    Returns
+    -------
+    np.ndarray
+        Load factor of each scenario.
+    """
+    sd = np.array([scan_load(case) for case in cases], dtype=float)
+    return sd / sd.max()
+
+
+def read_con(con):
+    """
+    Read the contingencies of a CON file.
+
+    Parameters
+    ----------
+    con : str
+        Path to the CON file.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per contingency with columns 'label', 'kind' ('gen' or
+        'branch'), 'bus', 'bus2' and 'id'; 'bus2' is -1 for generators.
+    """
+    rows = []
+    label = None
+    with open(con, 'r') as f:
+        for line in f:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == 'CONTINGENCY':
+                label = words[1]
+            elif words[0] == 'REMOVE':
+                # REMOVE UNIT <id> FROM BUS <bus>
+                rows.append((label, 'gen', int(words[5]), -1, words[2]))
+            elif words[0] == 'OPEN':
+                # OPEN BRANCH FROM BUS <bus> TO BUS <bus2> CIRCUIT <id>
+                rows.append((label, 'branch', int(words[4]), int(words[7]),
+                             words[9]))
+    return pd.DataFrame(rows, columns=['label', 'kind', 'bus', 'bus2', 'id'])
+
+
+def gen_index(system):
+    """
+    Build the map from generator ``(bus, id)`` to ``(model, uid, idx)``.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system loaded from the RAW file, before ``setup``.
+
+    Returns
+    -------
+    dict
+        The map over all models of the ``StaticGen`` group.
+    """
+    index = {}
+    for mdl in system.StaticGen.models.values():
+        for uid, (bus, gid, idx) in enumerate(zip(mdl.bus.v, mdl.subidx.v,
+                                                  mdl.idx.v)):
+            index[_gen_key(bus, gid)] = (mdl, uid, idx)
+    return index
+
+
+def _set_column(mdl, src, uid, value):
+    """
+    Write the input values of a parameter at ``uid`` in one assignment.
+
+    Before ``setup``, parameter values are kept as lists.
+    """
+    if len(uid) == 0:
+        return
+    param = getattr(mdl, src)
+    col = np.array(param.v, dtype=float)
+    col[uid] = value
+    param.v = col.tolist()
+
+
+def apply_json(system, data):
+    """
+    Apply the generator and load data of a GOC JSON file to a system.
+
+    Generators are matched through :py:func:`gen_index`, ramp rates and
+    commitment flags are written as one column assignment per model, and a
+    ``GCost`` and a ``DCost`` are added per generator and per load.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system loaded from the RAW file, before ``setup``.
+    data : dict
+        Contents of the JSON file.
+
+    Returns
+    -------
+    list
+        ``StaticGen`` idx of the JSON generators, in order.
+    """
+    index = gen_index(system)
+    gens = data['generators']
+    try:
+        matched = [index[_gen_key(gen['bus'], gen['id'])] for gen in gens]
+    except KeyError as e:
+        raise KeyError(f'Generator {e.args[0]} of the JSON file is not in the '
+                       'RAW file.') from None
+
+    prumax = np.array([gen['prumax'] for gen in gens], dtype=float)
+    suqual = np.array([gen['suqual'] for gen in gens], dtype=int)
+    sdqual = np.array([gen['sdqual'] for gen in gens], dtype=int)
+
+    models = np.array([m.class_name for m, _, _ in matched])
+    uids = np.array([u for _, u, _ in matched], dtype=int)
+    for mdl in system.StaticGen.models.values():
+        sel = models == mdl.class_name
+        if not sel.any():
+            continue
+        _set_column(mdl, 'R30', uids[sel], prumax[sel] / 2)
+        # gen enforce on/off status
+        off = sel & (suqual == 0)
+        _set_column(mdl, 'uf', uids[off], -1)
+        on = sel & (sdqual == 0)
+        _set_column(mdl, 'df', uids[on], 1)
+
+    stg_idx = [idx for _, _, idx in matched]
+    for gen, idx in zip(gens, stg_idx):
+        c1 = np.mean([cb['c'] for cb in gen['cblocks']])
+        system.add(model='GCost', param_dict=dict(gen=idx,
+                                                  csu=gen['sucost'],
+                                                  csd=gen['sdcost'],
+                                                  c0=gen['oncost'], c1=c1,
+                                                  c2=0))
+
+    # NOTE: here we know the data['loads'] and ss.PQ are one-to-one mapping
+    for load, pq_idx in zip(data['loads'], system.PQ.idx.v):
+        # pick the first point as cdp
+        system.add(model='DCost', param_dict=dict(pq=pq_idx,
+                                                  cdp=load['cblocks'][0]['c']))
+    return stg_idx
+
+
+def build_uc(raw, json_file, sd_data, ed=True, sfr=True, **kwargs):
+    """
+    Build the UC case of a GOC bundle.
+
+    Parameters
+    ----------
+    raw : str
+        Path to the RAW file of the base scenario.
+    json_file : str
+        Path to the JSON file of the base scenario.
+    sd_data : array-like
+        Load factor of each interval, e.g., from :py:func:`load_factors`.
+    ed : bool, optional
+        Add ``EDTSlot`` with the same load factors as ``UCTSlot``.
+    sfr : bool, optional
+        Add the secondary frequency regulation reserve and its cost.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Keyword arguments of ``ams.load``.
+
+    Returns
+    -------
+    ams.System
+        The system, before ``setup``.
+    """
+    kwargs = {**dict(default_config=True, no_output=True), **kwargs}
+    sp = ams.load(raw, setup=False, **kwargs)
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+    apply_json(sp, data)
+
+    # --- Region ---
+    # NOTE: add two regions, where the first one is the actually used one
+    sp.add(model='Region', param_dict=dict(idx='Zone_1'))
+    sp.add(model='Region', param_dict=dict(idx='Zone_2'))
+    sp.Bus.zone.v = sp.Bus.n * ['Zone_1']  # overwrite Bus.zone
+
+    # --- UC load factor ---
+    for sd in sd_data:
+        sp.add(model='UCTSlot', param_dict=dict(sd=f'{sd:.2f} ,0'))
+
+    # --- ED load factor ---
+    # NOTE: for placeholder
+    if ed:
+        ug = ', '.join(map(str, [1] * sp.StaticGen.n))
+        for sd in sd_data:
+            sp.add(model='EDTSlot', param_dict=dict(sd=f'{sd:.2f} ,0', ug=ug))
+
+    gens = sp.PV.idx.v + sp.Slack.idx.v
+    for z in sp.Region.idx.v:
+        # NOTE: use 0.1 for non-spinning and 0.3 for spinning reserve,
+        # and 0.02 for both du and dd of regulation reserve
+        sp.add(model='NSR', param_dict=dict(demand=0.1, zone=z))
+        sp.add(model='SR', param_dict=dict(demand=0.3, zone=z))
+        if sfr:
+            sp.add(model='SFR', param_dict=dict(du=0.02, dd=0.02, zone=z))
+    for stg_idx in gens:
+        sp.add(model='NSRCost', param_dict=dict(gen=stg_idx, cnsr=0.1))
+        sp.add(model='SRCost', param_dict=dict(gen=stg_idx, csr=0.1))
+        if sfr:
+            sp.add(model='SFRCost', param_dict=dict(gen=stg_idx, cru=0,
+                                                    crd=0))
+    return sp
@@ -4,10 +4,25 @@ Benchmark functions.
 
 import datetime
 import sys
+import os
+import time
+import hashlib
+import tempfile
 import importlib.metadata as importlib_metadata
 import logging
+import threading
+import weakref
+import contextlib
+import multiprocessing
+import multiprocessing.connection
+from concurrent.futures import ProcessPoolExecutor
 
-from andes.utils.misc import elapsed
+import numpy as np
+import pandas as pd
+import scipy.sparse as sps
+
+import cvxpy as cp
+import dill
 
 import ams
 
@@ -19,6 +34,93 @@ _failed_time = -1
 _failed_obj = -1
 
 cols_pre = ['ams_mats', 'ams_parse', 'ams_eval', 'ams_final', 'ams_postinit']
+cols_lf = ['scenario', 'lf', 'solver', 'time', 'obj', 'worker']
+
+# per-process state of the load-factor sweep workers
+_lf_worker = {}
+# unit data of the Lagrangian relaxation workers, one tuple per chunk
+_lr_worker = []
+
+# problem of the concurrent solvers, inherited by the forked workers
+_solver_job = {}
+
+# on-disk cache of set-up systems with the compiled routine
+_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '.cache')
+
+# interval of the resident set size sampling, s
+_rss_interval = 0.002
+
+# pandapower networks converted from systems, dropped with the system
+_ppn_cache = weakref.WeakKeyDictionary()
+
+# columns of the ppc bus matrix pushed into the cached network
+_ppc_pd, _ppc_qd = 2, 3
+
+
+def _toc(t0):
+    """
+    Seconds elapsed since ``t0``, a ``time.perf_counter_ns`` reading.
+    """
+    return (time.perf_counter_ns() - t0) * 1e-9
+
+
+def _rss():
+    """
+    Current resident set size of the process in bytes.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        # no procfs, fall back to the high-water mark
+        import resource
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class PeakRSS:
+    """
+    Peak resident set size of the process within a ``with`` block.
+
+    A thread samples the resident set size every ``_rss_interval`` seconds,
+    so the peak of one stage is not masked by an earlier stage, as with the
+    ``ru_maxrss`` high-water mark.
+    """
+
+    def __init__(self):
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(_rss_interval):
+            self.peak = max(self.peak, _rss())
+
+    def __enter__(self):
+        self.peak = _rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss())
+
+
+@contextlib.contextmanager
+def _track_rss(rss, stage):
+    """
+    Record the peak resident set size of a stage in ``rss``, if not None.
+    """
+    if rss is None:
+        yield
+        return
+    with PeakRSS() as probe:
+        yield
+    rss[stage] = probe.peak
 
 
 def get_tool_versions(tools=None):
@@ -102,10 +204,9 @@ def time_routine_solve(system, routine='DCOPF', **kwargs):
     rtn = system.routines[routine]
     solver = kwargs.get('solver', None)
     try:
-        t, _ = elapsed()
+        t = time.perf_counter_ns()
         rtn.run(**kwargs)
-        _, s0 = elapsed(t)
-        elapsed_time = float(s0.split(' ')[0])
+        elapsed_time = _toc(t)
         obj_value = rtn.obj.v
     except Exception as e:
         logger.error(f"Error running routine {
@@ -115,7 +216,7 @@ def time_routine_solve(system, routine='DCOPF', **kwargs):
     return elapsed_time, obj_value
 
 
-def pre_solve(system, routine):
+def pre_solve(system, routine, rss=None):
     """
     Time the routine preparation process.
 
@@ -125,6 +226,9 @@ def pre_solve(system, routine):
         The system object containing the routine.
     routine : str
         The name of the routine to prepare
+    rss : dict, optional
+        If given, filled with the peak resident set size in bytes of each
+        step.
 
     Returns
     -------
@@ -136,37 +240,203 @@ def pre_solve(system, routine):
 
     # Initialize AMS
     # --- matrices build ---
-    t_mats, _ = elapsed()
-    system.mats.build(force=True)
-    _, s_mats = elapsed(t_mats)
+    with _track_rss(rss, 'ams_mats'):
+        t_mats = time.perf_counter_ns()
+        system.mats.build(force=True)
+        s_mats = _toc(t_mats)
 
     # --- code generation ---
-    t_parse, _ = elapsed()
-    rtn.om.parse(force=True)
-    _, s_parse = elapsed(t_parse)
+    with _track_rss(rss, 'ams_parse'):
+        t_parse = time.perf_counter_ns()
+        rtn.om.parse(force=True)
+        s_parse = _toc(t_parse)
 
     # --- code evaluation ---
-    t_evaluate, _ = elapsed()
-    rtn.om.evaluate(force=True)
-    _, s_evaluate = elapsed(t_evaluate)
+    with _track_rss(rss, 'ams_eval'):
+        t_evaluate = time.perf_counter_ns()
+        rtn.om.evaluate(force=True)
+        s_evaluate = _toc(t_evaluate)
 
     # --- problem finalization ---
-    t_finalize, _ = elapsed()
-    rtn.om.finalize(force=True)
-    _, s_finalize = elapsed(t_finalize)
+    with _track_rss(rss, 'ams_final'):
+        t_finalize = time.perf_counter_ns()
+        rtn.om.finalize(force=True)
+        s_finalize = _toc(t_finalize)
 
     # --- rest init process ---
-    t_postinit, _ = elapsed()
-    rtn.init()
-    _, s_postinit = elapsed(t_postinit)
-
-    s_float = [float(s.split(' ')[0])
-               for s in [s_mats, s_parse, s_evaluate, s_finalize, s_postinit]]
+    with _track_rss(rss, 'ams_postinit'):
+        t_postinit = time.perf_counter_ns()
+        rtn.init()
+        s_postinit = _toc(t_postinit)
 
-    pre_time = dict(zip(cols_pre, s_float))
+    pre_time = dict(zip(cols_pre, [s_mats, s_parse, s_evaluate, s_finalize,
+                                   s_postinit]))
     return pre_time
 
 
+def case_key(case, routine='DCOPF', addfile=None, tools=('ltbams', 'cvxpy'),
+             **kwargs):
+    """
+    Hash a case for the compiled-problem cache.
+
+    The key covers the content of the case file and the addfile, the
+    routine, the load keyword arguments, and the versions of ``tools``, so
+    that any change of the case or of the code generation invalidates it.
+
+    Parameters
+    ----------
+    case : str
+        Path to the case file.
+    routine : str, optional
+        The name of the routine to prepare. Defaults to 'DCOPF'.
+    addfile : str, optional
+        Path to the addfile.
+    tools : tuple of str, optional
+        Packages whose versions are part of the key.
+
+    Returns
+    -------
+    str
+        The hex digest of the key.
+    """
+    h = hashlib.sha256()
+    for path in (case, addfile):
+        if path is None:
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    h.update(routine.encode())
+    h.update(repr(sorted(kwargs.items())).encode())
+    for tool in tools:
+        try:
+            version = importlib_metadata.version(tool)
+        except importlib_metadata.PackageNotFoundError:
+            version = 'Not installed'
+        h.update(f'{tool}={version}'.encode())
+    return h.hexdigest()
+
+
+def load_cached(case, routine='DCOPF', cache_dir=None, refresh=False,
+                **kwargs):
+    """
+    Load a case with its routine prepared, restoring it from the
+    compiled-problem cache when possible.
+
+    On a miss, the case is loaded with ``ams.load``, the matrices are built
+    and the routine is parsed, evaluated and finalized as in
+    :py:func:`pre_solve`, and the system is written to the cache. On a hit,
+    the system is restored with all those stages already done, and only
+    ``rtn.init`` is left.
+
+    Parameters
+    ----------
+    case : str
+        Path to the case file.
+    routine : str, optional
+        The name of the routine to prepare. Defaults to 'DCOPF'.
+    cache_dir : str, optional
+        Cache folder. Defaults to ``.cache`` beside this file.
+    refresh : bool, optional
+        Rebuild and overwrite the cached entry.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Keyword arguments of ``ams.load``. Defaults to
+        ``setup=True, no_output=True, default_config=True``.
+
+    Returns
+    -------
+    tuple
+        The system, the preparation times in seconds with the ``ams_load``
+        and ``cache_io`` stages ahead of the ``cols_pre`` ones, and whether
+        the cache was hit.
+    """
+    kwargs = {**dict(setup=True, no_output=True, default_config=True),
+              **kwargs}
+    cache_dir = _cache_dir if cache_dir is None else cache_dir
+    key = case_key(case, routine=routine, **kwargs)
+    path = os.path.join(cache_dir, f'{key}.pkl')
+
+    if os.path.isfile(path) and not refresh:
+        try:
+            t_io = time.perf_counter_ns()
+            with open(path, 'rb') as f:
+                system = dill.load(f)
+            s_io = _toc(t_io)
+
+            t_postinit = time.perf_counter_ns()
+            system.routines[routine].init()
+            s_postinit = _toc(t_postinit)
+
+            pre_time = dict(ams_load=0.0, cache_io=s_io,
+                            **dict.fromkeys(cols_pre, 0.0))
+            pre_time['ams_postinit'] = s_postinit
+            return system, pre_time, True
+        except Exception as e:
+            logger.warning(f"Failed to restore cached {case}, rebuilding: {e}")
+
+    t_load = time.perf_counter_ns()
+    system = ams.load(case, **kwargs)
+    s_load = _toc(t_load)
+    pre_time = dict(ams_load=s_load, cache_io=0.0,
+                    **pre_solve(system, routine))
+
+    # write to a temporary file first so that readers never see a partial entry
+    t_io = time.perf_counter_ns()
+    tmp = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            dill.dump(system, f, recurse=True)
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"Failed to cache {case}: {e}")
+        # do not leave a partial entry behind
+        if tmp is not None and os.path.exists(tmp):
+            os.unlink(tmp)
+    s_io = _toc(t_io)
+    pre_time['cache_io'] = s_io
+    return system, pre_time, False
+
+
+def time_pre_solve_cache(case, routine='DCOPF', cache_dir=None, **kwargs):
+    """
+    Time the cold and warm startup of a case with the compiled-problem
+    cache.
+
+    The cold startup rebuilds and rewrites the cache entry, and the warm
+    startup restores it, both through :py:func:`load_cached`.
+
+    Parameters
+    ----------
+    case : str
+        Path to the case file.
+    routine : str, optional
+        The name of the routine to prepare. Defaults to 'DCOPF'.
+    cache_dir : str, optional
+        Cache folder. Defaults to ``.cache`` beside this file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The times in seconds of each stage, indexed by 'cold' and 'warm',
+        with a 'total' column.
+    """
+    _, cold, _ = load_cached(case, routine=routine, cache_dir=cache_dir,
+                             refresh=True, **kwargs)
+    _, warm, hit = load_cached(case, routine=routine, cache_dir=cache_dir,
+                               **kwargs)
+    if not hit:
+        logger.warning(f"Cache of {case} was not hit on the warm startup.")
+
+    out = pd.DataFrame([cold, warm], index=['cold', 'warm'])
+    out['total'] = out.sum(axis=1)
+    return out
+
+
 def time_pdp_dcopf(ppn):
     """
     Test the execution time of DCOPF using pandapower.
@@ -182,10 +452,9 @@ def time_pdp_dcopf(ppn):
         A tuple containing the elapsed time (s) and the objective value ($).
     """
     try:
-        t_pdp, _ = elapsed()
+        t_pdp = time.perf_counter_ns()
         pdp.rundcopp(ppn)
-        _, s_pdp = elapsed(t_pdp)
-        elapsed_time = float(s_pdp.split(' ')[0])
+        elapsed_time = _toc(t_pdp)
         obj_value = ppn.res_cost
     except Exception as e:
         logger.error(f"Error running pandapower: {e}")
@@ -194,8 +463,228 @@ def time_pdp_dcopf(ppn):
     return elapsed_time, obj_value
 
 
-def time_routine(system, routine='DCOPF', solvers=['CLARABEL'],
-                 **kwargs):
+def _convert_ppn(system):
+    """
+    Convert a system to a pandapower network through PYPOWER, and make a
+    cache entry of it.
+    """
+    ppc = ams.io.pypower.system2ppc(system)
+    ppn = pdp.converter.from_ppc(ppc, f_hz=system.config.freq)
+    # position in the ppc bus matrix of the bus of each load
+    load_bus = ppn.bus.index.get_indexer(ppn.load['bus'])
+    return dict(ppc=ppc, ppn=ppn, load_bus=load_bus)
+
+
+def _push_loads(entry, ppc):
+    """
+    Push the bus loads of a new ppc into the cached network.
+
+    Returns False if the ppc differs from the cached one in anything else,
+    or has load at a bus without a load in the network.
+    """
+    old = entry['ppc']
+    for key in ('baseMVA', 'gen', 'branch', 'gencost'):
+        if not np.array_equal(np.asarray(old[key]), np.asarray(ppc[key])):
+            return False
+    bus_old, bus_new = old['bus'], ppc['bus']
+    if bus_old.shape != bus_new.shape:
+        return False
+    other = np.ones(bus_new.shape[1], dtype=bool)
+    other[[_ppc_pd, _ppc_qd]] = False
+    if not np.array_equal(bus_old[:, other], bus_new[:, other]):
+        return False
+
+    load = np.zeros(bus_new.shape[0], dtype=bool)
+    load[entry['load_bus']] = True
+    loaded = (bus_new[:, _ppc_pd] != 0) | (bus_new[:, _ppc_qd] != 0)
+    if np.any(loaded & ~load):
+        return False
+
+    ppn = entry['ppn']
+    ppn.load['p_mw'] = bus_new[entry['load_bus'], _ppc_pd]
+    ppn.load['q_mvar'] = bus_new[entry['load_bus'], _ppc_qd]
+    entry['ppc'] = ppc
+    return True
+
+
+def get_ppn(system, refresh=False):
+    """
+    Get the pandapower network of a system, converted once and updated in
+    place afterwards.
+
+    Networks are cached by system identity. On a cache hit, the system is
+    converted to PYPOWER again, which is cheap, and if only the loads
+    changed, the new ``p_mw`` and ``q_mvar`` are written into the cached
+    network instead of rebuilding it with ``from_ppc``. Any other change
+    rebuilds the network.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system object.
+    refresh : bool, optional
+        Rebuild the network even on a cache hit.
+
+    Returns
+    -------
+    pandapowerNet
+        The network, shared between calls.
+    """
+    entry = _ppn_cache.get(system)
+    if entry is not None and not refresh:
+        ppc = ams.io.pypower.system2ppc(system)
+        if _push_loads(entry, ppc):
+            return entry['ppn']
+        logger.debug('System changed beyond the loads, rebuilding the '
+                     'pandapower network.')
+    entry = _convert_ppn(system)
+    _ppn_cache[system] = entry
+    return entry['ppn']
+
+
+def check_ppn_cache(system, load_factors=[1]):
+    """
+    Compare the cached and rebuilt pandapower networks over load factors.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system object.
+    load_factors : list of float, optional
+        Load factors applied to ``PQ.p0``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Conversion time (s) and objective ($) of each path per load factor,
+        and whether the objectives are identical.
+    """
+    pq_idx = system.PQ.idx.v
+    pd0 = system.PQ.p0.v.copy()
+    get_ppn(system)
+
+    rows = []
+    for lf_k in load_factors:
+        system.PQ.set(src='p0', attr='v', idx=pq_idx, value=lf_k * pd0)
+        t = time.perf_counter_ns()
+        ppn = get_ppn(system)
+        t_cached = _toc(t)
+        _, obj_cached = time_pdp_dcopf(ppn)
+
+        t = time.perf_counter_ns()
+        ppn = _convert_ppn(system)['ppn']
+        t_rebuilt = _toc(t)
+        _, obj_rebuilt = time_pdp_dcopf(ppn)
+        rows.append(dict(lf=lf_k, cached_time=t_cached,
+                         rebuilt_time=t_rebuilt, cached_obj=obj_cached,
+                         rebuilt_obj=obj_rebuilt,
+                         identical=obj_cached == obj_rebuilt))
+    system.PQ.set(src='p0', attr='v', idx=pq_idx, value=pd0)
+    return pd.DataFrame(rows)
+
+
+def _solver_worker(solver, conn):
+    """
+    Solve the problem of ``_solver_job`` with one solver in a forked worker
+    and send back the time, objective, convergence and, for a race, the
+    variable values.
+    """
+    job = _solver_job
+    system, routine = job['system'], job['routine']
+    out = (_failed_time, _failed_obj, False, None)
+    try:
+        if solver == 'pandapower':
+            s, obj = time_pdp_dcopf(job['ppn'])
+            ok = s != _failed_time and bool(job['ppn'].OPF_converged)
+            out = (s, obj, ok, None)
+        else:
+            s, obj = time_routine_solve(system, routine, solver=solver,
+                                        **job['kwargs'])
+            rtn = system.routines[routine]
+            ok = s != _failed_time and bool(rtn.converged)
+            x = None
+            if job['race'] and ok:
+                x = {name: np.array(var.v) for name, var in rtn.vars.items()}
+            out = (s, obj, ok, x)
+    finally:
+        conn.send(out)
+        conn.close()
+
+
+def _solve_concurrent(system, routine, solvers, timeout=None, race=False,
+                      **kwargs):
+    """
+    Solve a prepared routine with each solver in its own forked process.
+
+    The workers inherit the compiled problem of the parent through
+    ``_solver_job`` instead of pickling it, and the parent waits for them up
+    to ``timeout`` seconds, then terminates the rest. With ``race``, the
+    rest are terminated as soon as one solver converges.
+
+    Returns
+    -------
+    dict
+        Time, objective and status of each solver, as in
+        :py:func:`time_routine`.
+    """
+    sol = {solver: dict(time=_failed_time, obj=_failed_obj, status='failed')
+           for solver in solvers}
+    ppn = None
+    if 'pandapower' in solvers and routine == 'DCOPF':
+        ppn = get_ppn(system)
+
+    _solver_job.clear()
+    _solver_job.update(system=system, routine=routine, ppn=ppn, race=race,
+                       kwargs=kwargs)
+
+    ctx = multiprocessing.get_context('fork')
+    pending = {}
+    for solver in solvers:
+        if solver == 'pandapower' and ppn is None:
+            continue
+        recv, send = ctx.Pipe(duplex=False)
+        proc = ctx.Process(target=_solver_worker, args=(solver, send),
+                           daemon=True)
+        proc.start()
+        send.close()
+        pending[recv] = (solver, proc)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    winner = None
+    while pending and winner is None:
+        wait = None
+        if deadline is not None:
+            wait = max(deadline - time.monotonic(), 0)
+        ready = multiprocessing.connection.wait(list(pending), timeout=wait)
+        if not ready:
+            break
+        for recv in ready:
+            solver, proc = pending.pop(recv)
+            try:
+                s, obj, ok, x = recv.recv()
+            except EOFError:
+                logger.error(f"Solver {solver} exited without a result.")
+                s, obj, ok, x = _failed_time, _failed_obj, False, None
+            proc.join()
+            sol[solver].update(time=s, obj=obj,
+                               status='optimal' if ok else 'failed')
+            if race and ok and winner is None:
+                winner = solver
+                sol[solver].update(winner=True, x=x)
+
+    for recv, (solver, proc) in pending.items():
+        proc.terminate()
+        proc.join()
+        recv.close()
+        sol[solver]['status'] = 'cancelled' if winner else 'timeout'
+        if winner is None:
+            logger.warning(f"Solver {solver} timed out after {timeout} s.")
+    _solver_job.clear()
+    return sol
+
+
+def time_routine(system, routine='DCOPF', solvers=['CLARABEL'], rss=None,
+                 concurrent=False, timeout=None, race=False, **kwargs):
     """
     Time the specified routine with the given solvers.
 
@@ -207,6 +696,21 @@ def time_routine(system, routine='DCOPF', solvers=['CLARABEL'],
         The name of the routine to run. Defaults to 'DCOPF'.
     solvers : list of str, optional
         List of solvers to use. Defaults to ['CLARABEL'].
+    rss : dict, optional
+        If given, filled with the peak resident set size in bytes of each
+        preparation step and, if not ``concurrent``, of each solver.
+    concurrent : bool, optional
+        Solve with all solvers at once, each in a forked process sharing
+        the compiled problem. The solution stays in the workers, so the
+        routine of ``system`` is not updated.
+    timeout : float, optional
+        In the concurrent mode, time in seconds after which the solvers
+        still running are terminated and get the status 'timeout'.
+    race : bool, optional
+        In the concurrent mode, stop at the first solver that converges.
+        Its entry gets ``winner=True`` and the variable values in 'x', and
+        the solvers still running get the status 'cancelled'. Implies
+        ``concurrent``.
 
     Other Parameters
     ----------------
@@ -217,21 +721,28 @@ def time_routine(system, routine='DCOPF', solvers=['CLARABEL'],
     -------
     tuple
         A tuple containing the preparation times and the solution times in
-        seconds for each solver.
+        seconds for each solver. In the concurrent mode, each solver also
+        has a 'status' of 'optimal', 'failed', 'timeout' or 'cancelled'.
     """
-    pre_time = pre_solve(system, routine)
+    pre_time = pre_solve(system, routine, rss=rss)
+    if concurrent or race:
+        sol = _solve_concurrent(system, routine, solvers, timeout=timeout,
+                                race=race, **kwargs)
+        return pre_time, sol
+
     sol = {f'{solver}': {'time': 0, 'obj': 0} for solver in solvers}
 
     for solver in solvers:
         if solver != 'pandapower':
-            s, obj = time_routine_solve(
-                system, routine, solver=solver, **kwargs)
+            with _track_rss(rss, solver):
+                s, obj = time_routine_solve(
+                    system, routine, solver=solver, **kwargs)
             sol[solver]['time'] = s
             sol[solver]['obj'] = obj
         elif solver == 'pandapower' and routine == 'DCOPF':
-            ppc = ams.io.pypower.system2ppc(system)
-            ppn = pdp.converter.from_ppc(ppc, f_hz=system.config.freq)
-            s, obj = time_pdp_dcopf(ppn)
+            ppn = get_ppn(system)
+            with _track_rss(rss, solver):
+                s, obj = time_pdp_dcopf(ppn)
             sol[solver]['time'] = s
             sol[solver]['obj'] = obj
         else:
@@ -242,7 +753,7 @@ def time_routine(system, routine='DCOPF', solvers=['CLARABEL'],
 
 
 def time_dcopf_with_lf(system, solvers=['CLARABEL'], load_factors=[1],
-                       ignore_dpp=False):
+                       ignore_dpp=False, rss=None):
     """
     Time the execution of DCOPF with varying load factors.
 
@@ -256,13 +767,17 @@ def time_dcopf_with_lf(system, solvers=['CLARABEL'], load_factors=[1],
         List of load factors to apply. Defaults to None.
     ignore_dpp : bool, optional
         Whether to ignore DPP.
+    rss : dict, optional
+        If given, filled with the peak resident set size in bytes of each
+        preparation step and solver.
 
     Returns
     -------
     tuple
         A tuple containing the list of times and the list of objective values.
+        A solver failing on any load factor gets the failure values.
     """
-    pre_time = pre_solve(system, 'DCOPF')
+    pre_time = pre_solve(system, 'DCOPF', rss=rss)
     sol = {f'{solver}': {'time': 0, 'obj': 0} for solver in solvers}
 
     pd0 = system.PQ.p0.v.copy()
@@ -271,35 +786,692 @@ def time_dcopf_with_lf(system, solvers=['CLARABEL'], load_factors=[1],
     for solver in solvers:
         if solver != 'pandapower':
             obj_all = 0
-            t_all, _ = elapsed()
-            for lf_k in load_factors:
-                system.PQ.set(src='p0', attr='v', idx=pq_idx, value=lf_k * pd0)
-                system.DCOPF.update(params=['pd'])
-                _, obj = time_routine_solve(system, 'DCOPF',
-                                            solver=solver,
-                                            ignore_dpp=ignore_dpp)
-                obj_all += obj
-            _, s_all = elapsed(t_all)
+            failed = False
+            with _track_rss(rss, solver):
+                t_all = time.perf_counter_ns()
+                for lf_k in load_factors:
+                    system.PQ.set(src='p0', attr='v', idx=pq_idx,
+                                  value=lf_k * pd0)
+                    system.DCOPF.update(params=['pd'])
+                    s, obj = time_routine_solve(system, 'DCOPF',
+                                                solver=solver,
+                                                ignore_dpp=ignore_dpp)
+                    failed = failed or s == _failed_time
+                    obj_all += obj
+                s_all = _toc(t_all)
             system.PQ.set(src='p0', attr='v', idx=pq_idx, value=pd0)
-            s = float(s_all.split(' ')[0])
-            sol[solver]['time'] = s
-            sol[solver]['obj'] = obj_all
+            sol[solver]['time'] = _failed_time if failed else s_all
+            sol[solver]['obj'] = _failed_obj if failed else obj_all
         elif solver == 'pandapower':
-            ppc = ams.io.pypower.system2ppc(system)
-            ppn = pdp.converter.from_ppc(ppc, f_hz=system.config.freq)
+            ppn = get_ppn(system)
             p_mw0 = ppn.load['p_mw'].copy()
-            t_all, _ = elapsed()
             obj_all = 0
+            failed = False
+            with _track_rss(rss, solver):
+                t_all = time.perf_counter_ns()
+                for lf_k in load_factors:
+                    ppn.load['p_mw'] = lf_k * p_mw0
+                    s, obj = time_pdp_dcopf(ppn)
+                    failed = failed or s == _failed_time
+                    obj_all += obj
+                s_all = _toc(t_all)
+            ppn.load['p_mw'] = p_mw0
+            sol[solver]['time'] = _failed_time if failed else s_all
+            sol[solver]['obj'] = _failed_obj if failed else obj_all
+        else:
+            sol[solver]['time'] = _failed_time
+            sol[solver]['obj'] = _failed_obj
+
+    return pre_time, sol
+
+
+def time_dcopf_series(system, solver='CLARABEL', load_factors=[1],
+                      modes=('cold', 'warm')):
+    """
+    Time a sequence of DCOPF snapshots with varying load factors, solved
+    cold or warm-started.
+
+    In the ``'cold'`` mode, each snapshot follows the usual path: set
+    ``PQ.p0``, ``DCOPF.update('pd')`` and run with ``ignore_dpp=True``, so
+    the problem is canonicalized and solved from scratch.
+    In the ``'warm'`` mode, the problem is compiled once as a parametrized
+    (DPP) problem, and each snapshot only writes the ``pd`` parameter and
+    solves with ``warm_start=True`` from the previous primal/dual solution.
+    Solvers without warm-start support in cvxpy still reuse the compiled
+    problem.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system object containing the routine.
+    solver : str, optional
+        The solver to use. Defaults to 'CLARABEL'.
+    load_factors : list of float, optional
+        Load factors of the snapshots, in order.
+    modes : tuple of str, optional
+        Modes to time, from 'cold' and 'warm'.
+
+    Returns
+    -------
+    pd.DataFrame
+        Time (s) and objective ($) of each snapshot in each mode, indexed by
+        snapshot.
+    """
+    rtn = system.DCOPF
+    pq_idx = system.PQ.idx.v
+    pd0 = system.PQ.p0.v.copy()
+
+    res = pd.DataFrame(index=pd.RangeIndex(len(load_factors), name='snapshot'))
+    res['lf'] = load_factors
+    for mode in modes:
+        pre_solve(system, 'DCOPF')
+        times, objs = [], []
+        if mode == 'cold':
             for lf_k in load_factors:
-                ppn.load['p_mw'] = lf_k * p_mw0
-                _, obj = time_pdp_dcopf(ppn)
-                obj_all += obj
-            _, s_all = elapsed(t_all)
-            s = float(s_all.split(' ')[0])
-            sol[solver]['time'] = s
-            sol[solver]['obj'] = obj_all
+                t = time.perf_counter_ns()
+                system.PQ.set(src='p0', attr='v', idx=pq_idx, value=lf_k * pd0)
+                rtn.update(params=['pd'])
+                _, obj = time_routine_solve(system, 'DCOPF', solver=solver,
+                                            ignore_dpp=True)
+                s = _toc(t)
+                times.append(s)
+                objs.append(obj)
+        elif mode == 'warm':
+            pd_optz = rtn.om.params['pd'].optz
+            pd_v0 = pd_optz.value.copy()
+            for lf_k in load_factors:
+                t = time.perf_counter_ns()
+                # only the right-hand side changes, so the compiled problem
+                # is kept and the parameter is written in place
+                pd_optz.value = lf_k * pd_v0
+                _, obj = time_routine_solve(system, 'DCOPF', solver=solver,
+                                            ignore_dpp=False, warm_start=True)
+                s = _toc(t)
+                times.append(s)
+                objs.append(obj)
+            pd_optz.value = pd_v0
         else:
+            raise ValueError(f'Unknown mode <{mode}>.')
+        system.PQ.set(src='p0', attr='v', idx=pq_idx, value=pd0)
+        res[f'{mode}_time'] = times
+        res[f'{mode}_obj'] = objs
+
+    rtn.update(params=['pd'])
+    return res
+
+
+def build_dcopf_batch(system, n_scenarios):
+    """
+    Build a DCOPF of ``n_scenarios`` load scenarios stacked into one
+    problem.
+
+    The scenarios share the network and generator data of the system's
+    DCOPF, and are coupled by nothing, so the stacked problem is block
+    diagonal: generator outputs are an ``(ng, K)`` variable, and the power
+    balance, the PTDF line flow limits and the line angle difference limits
+    are written column-wise. As in the DCOPF of AMS, uncontrollable units
+    are fixed at ``pg0`` and the flows include the phase shifter injections
+    ``Pbusinj`` and ``Pfinj``. The load of the scenarios is the ``(nl, K)``
+    parameter ``pdk``.
+
+    Use :py:func:`check_dcopf_batch` to compare the objectives with the
+    DCOPF of AMS.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system object, with the DCOPF initialized.
+    n_scenarios : int
+        Number of stacked scenarios, K.
+
+    Returns
+    -------
+    tuple
+        The cvxpy problem, the ``pg`` variable, the ``pdk`` parameter, and
+        the expression of the objective of each scenario.
+    """
+    rtn = system.DCOPF
+    mats = system.mats
+    if mats.PTDF._v is None:
+        mats.build_ptdf()
+
+    ng, K = len(rtn.pg.v), n_scenarios
+    ug = rtn.ug.v
+    c2, c1, c0 = rtn.c2.v, rtn.c1.v, rtn.c0.v
+    ctrl = rtn.ctrl.v * ug
+    nctrl = (1 - rtn.ctrl.v) * ug
+    pmax = nctrl * rtn.pg0.v + ctrl * rtn.pmax.v
+    pmin = nctrl * rtn.pg0.v + ctrl * rtn.pmin.v
+
+    Cg = sps.csr_matrix(mats.Cg._v)
+    Cl = sps.csr_matrix(mats.Cl._v)
+    PTDF = np.asarray(mats.PTDF._v)
+    rate_a = rtn.rate_a.v
+    # active power consumed by shunts, fixed across scenarios
+    psh = np.zeros(system.Bus.n)
+    if system.Shunt.n:
+        gsh = system.Shunt.g.v * system.Shunt.u.v
+        psh = sps.csr_matrix(mats.Csh._v) @ gsh
+    # phase shifter injections, which sum to zero over the buses
+    pbusinj = np.asarray(rtn.Pbusinj.v, dtype=float).ravel()
+    pfinj = np.asarray(rtn.Pfinj.v, dtype=float).ravel()
+
+    pg = cp.Variable((ng, K), name='pg')
+    pdk = cp.Parameter((Cl.shape[1], K), name='pdk')
+
+    obj_k = (c2 @ cp.square(pg) + c1 @ pg + np.sum(ug * c0))
+    cons = [pg <= cp.multiply(pmax, np.ones((1, K))),
+            pg >= cp.multiply(pmin, np.ones((1, K))),
+            cp.sum(pg, axis=0) == cp.sum(pdk, axis=0) + psh.sum()]
+    plf = (PTDF @ (Cg @ pg - Cl @ pdk)
+           - (PTDF @ (psh + pbusinj) - pfinj)[:, None])
+    limited = rate_a < 1e5
+    if np.any(limited):
+        cons += [plf[limited, :] <= rate_a[limited, None],
+                 plf[limited, :] >= -rate_a[limited, None]]
+
+    # the angle difference of a line is its flow without the phase shifter
+    # injection over its susceptance, taken from the from-bus entry of Bf
+    Bf = sps.csr_matrix(mats.Bf._v)
+    Cft = sps.csr_matrix(mats.Cft._v)
+    bl = 0.5 * np.asarray(Bf.multiply(Cft.T).sum(axis=1)).ravel()
+    alo = np.minimum(bl * rtn.amin.v, bl * rtn.amax.v)
+    ahi = np.maximum(bl * rtn.amin.v, bl * rtn.amax.v)
+    angled = bl != 0
+    if np.any(angled):
+        pa = plf[angled, :] - pfinj[angled, None]
+        cons += [pa <= ahi[angled, None], pa >= alo[angled, None]]
+
+    prob = cp.Problem(cp.Minimize(cp.sum(obj_k)), cons)
+    return prob, pg, pdk, obj_k
+
+
+def time_dcopf_batch(system, solvers=['CLARABEL'], load_factors=[1],
+                     batch_size=None):
+    """
+    Time the execution of DCOPF with varying load factors, solved as
+    batches of stacked scenarios.
+
+    Instead of solving one DCOPF per load factor, as in
+    :py:func:`time_dcopf_with_lf`, ``batch_size`` load scenarios are
+    stacked into one block-diagonal problem by
+    :py:func:`build_dcopf_batch`, solved once, and split back into the
+    per-scenario ``pg`` and objective. The problem is compiled once and
+    reused for all batches of the same size.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system object containing the routine.
+    solvers : list of str, optional
+        List of solvers to use. Defaults to ['CLARABEL'].
+    load_factors : list of float, optional
+        List of load factors to apply. Defaults to [1].
+    batch_size : int, optional
+        Number of scenarios per batch. Defaults to all load factors.
+
+    Returns
+    -------
+    tuple
+        A tuple containing the preparation times, and the solution time (s),
+        total objective ($), per-scenario objectives, and ``(ng, n_lf)``
+        per-scenario generator outputs of each solver.
+    """
+    pre_time = pre_solve(system, 'DCOPF')
+    sol = {f'{solver}': {'time': 0, 'obj': 0} for solver in solvers}
+
+    load_factors = np.asarray(load_factors, dtype=float).ravel()
+    n_lf = len(load_factors)
+    batch_size = n_lf if batch_size is None else min(batch_size, n_lf)
+    pd0 = system.DCOPF.pd.v.copy()
+    ng = len(system.DCOPF.pg.v)
+
+    probs = {}
+    for solver in solvers:
+        objs = np.full(n_lf, _failed_obj, dtype=float)
+        pgs = np.full((ng, n_lf), np.nan)
+        t_all = time.perf_counter_ns()
+        try:
+            for i in range(0, n_lf, batch_size):
+                lf = load_factors[i:i + batch_size]
+                if len(lf) not in probs:
+                    probs[len(lf)] = build_dcopf_batch(system, len(lf))
+                prob, pg, pdk, obj_k = probs[len(lf)]
+                pdk.value = np.outer(pd0, lf)
+                prob.solve(solver=solver)
+                objs[i:i + len(lf)] = obj_k.value
+                pgs[:, i:i + len(lf)] = pg.value
+            s_all = _toc(t_all)
+            sol[solver]['time'] = s_all
+            sol[solver]['obj'] = objs.sum()
+        except Exception as e:
+            logger.error(f"Error running batched DCOPF with solver {solver}: {e}")
             sol[solver]['time'] = _failed_time
             sol[solver]['obj'] = _failed_obj
+        sol[solver]['obj_k'] = objs
+        sol[solver]['pg'] = pgs
 
     return pre_time, sol
+
+
+def check_dcopf_batch(system, load_factors=[1], solver='CLARABEL',
+                      rtol=1e-5):
+    """
+    Compare the objectives of the batched DCOPF with the DCOPF of AMS.
+
+    Each load factor is solved by :py:func:`time_dcopf_batch` in one batch,
+    and by ``DCOPF.run`` after scaling ``PQ.p0``.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system object.
+    load_factors : list of float, optional
+        Load factors applied to ``PQ.p0``.
+    solver : str, optional
+        Solver of both paths.
+    rtol : float, optional
+        Relative tolerance of the objectives.
+
+    Returns
+    -------
+    pd.DataFrame
+        Objective ($) of each path per load factor, and whether they agree
+        within ``rtol``.
+    """
+    _, sol = time_dcopf_batch(system, solvers=[solver],
+                              load_factors=load_factors)
+    obj_batch = sol[solver]['obj_k']
+
+    pq_idx = system.PQ.idx.v
+    pd0 = system.PQ.p0.v.copy()
+    rows = []
+    for lf_k, obj_b in zip(load_factors, obj_batch):
+        system.PQ.set(src='p0', attr='v', idx=pq_idx, value=lf_k * pd0)
+        system.DCOPF.update(params=['pd'])
+        _, obj = time_routine_solve(system, 'DCOPF', solver=solver)
+        rows.append(dict(lf=lf_k, batch_obj=obj_b, dcopf_obj=obj,
+                         close=bool(np.isclose(obj_b, obj, rtol=rtol))))
+    system.PQ.set(src='p0', attr='v', idx=pq_idx, value=pd0)
+    system.DCOPF.update(params=['pd'])
+    return pd.DataFrame(rows)
+
+
+def _lr_units(lam, c0, c1, c2, csu, csd, pmin, pmax, ug0):
+    """
+    Solve the unit subproblems of the Lagrangian relaxation of UC.
+
+    With the power balance relaxed at prices ``lam``, each unit is
+    committed independently. For a given commitment, the best output is
+    closed-form, and the commitment over the horizon is found by dynamic
+    programming over the off and on states, for all units at once.
+
+    Returns
+    -------
+    tuple
+        The commitment and the output, both ``(ng, nt)``, and the total cost
+        of the subproblems.
+    """
+    ng, nt = len(c0), len(lam)
+    lam = lam[None, :]
+    c1, c2 = c1[:, None], c2[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.where(c2 > 0, (lam - c1) / (2 * c2),
+                     np.where(lam > c1, np.inf, -np.inf))
+    p = np.clip(p, pmin[:, None], pmax[:, None])
+    g = c0[:, None] + c2 * p**2 + (c1 - lam) * p
+
+    # cost-to-arrive of the off and on states, and the best predecessors
+    j_off = csd * ug0
+    j_on = g[:, 0] + csu * (1 - ug0)
+    on_from_off = np.zeros((ng, nt), dtype=bool)
+    off_from_on = np.zeros((ng, nt), dtype=bool)
+    on_from_off[:, 0] = ug0 == 0
+    off_from_on[:, 0] = ug0 == 1
+    for t in range(1, nt):
+        start = j_off + csu
+        stop = j_on + csd
+        on_from_off[:, t] = start < j_on
+        off_from_on[:, t] = stop < j_off
+        j_on, j_off = (g[:, t] + np.minimum(j_on, start),
+                       np.minimum(j_off, stop))
+
+    u = np.zeros((ng, nt))
+    state = j_on < j_off
+    for t in range(nt - 1, -1, -1):
+        u[:, t] = state
+        state = np.where(state, ~on_from_off[:, t], off_from_on[:, t])
+    return u, u * p, np.minimum(j_on, j_off).sum()
+
+
+def _init_lr_worker(parts):
+    """
+    Initialize a Lagrangian relaxation worker.
+
+    The unit data of each chunk is kept in the module-level ``_lr_worker``,
+    so the iterations only send the prices.
+    """
+    _lr_worker[:] = parts
+
+
+def _lr_chunk(args):
+    """
+    Solve the unit subproblems of one chunk of units.
+    """
+    lam, k = args
+    return _lr_units(lam, *_lr_worker[k])
+
+
+def solve_uc_lr(system, max_iter=50, step=0.1, tol=1e-3, solver='CLARABEL',
+                n_workers=1, margin=0.05):
+    """
+    Solve UC by Lagrangian relaxation of the power balance.
+
+    The dual problem is solved by subgradient steps on the prices of the
+    periods, with the unit subproblems solved by dynamic programming, in
+    ``n_workers`` processes when more than one. The commitment of the
+    best dual iterate is repaired to cover the load with a ``margin``, and
+    then dispatched by ED, with network and reserves, through
+    ``EDTSlot.ug``. The ED objective plus the startup and shutdown costs is
+    the upper bound.
+
+    The relaxation leaves out the network, the reserves and the minimum
+    on and off times, so the lower bound is that of a relaxed UC.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system with as many ``EDTSlot`` as ``UCTSlot``.
+    max_iter : int, optional
+        Maximum number of subgradient iterations.
+    step : float, optional
+        Initial step of the prices, relative to their initial value.
+    tol : float, optional
+        Stop when the relative power balance mismatch is below ``tol``.
+    solver : str, optional
+        Solver of the ED. Defaults to 'CLARABEL'.
+    n_workers : int, optional
+        Number of worker processes for the unit subproblems.
+    margin : float, optional
+        Committed capacity above the load in the repair, as a fraction.
+
+    Returns
+    -------
+    dict
+        The commitment 'ugd', the bounds 'lb' and 'ub', the relative 'gap',
+        the number of iterations 'n_iter', and the times 'lr' and 'ed' (s).
+    """
+    gen = system.StaticGen.get_all_idxes()
+    pmax = system.StaticGen.get(src='pmax', attr='v', idx=gen)
+    pmin = system.StaticGen.get(src='pmin', attr='v', idx=gen)
+    ug0 = system.StaticGen.get(src='u', attr='v', idx=gen)
+
+    # costs of the units, matched by gen once
+    pos = {g: k for k, g in enumerate(system.GCost.gen.v)}
+    uid = np.array([pos[g] for g in gen], dtype=int)
+    gc = system.GCost
+    c0, c1, c2 = gc.c0.v[uid], gc.c1.v[uid], gc.c2.v[uid]
+    csu, csd = gc.csu.v[uid], gc.csd.v[uid]
+
+    # load of each period from the zonal load factors
+    zones = list(system.Region.idx.v)
+    lzone = system.Bus.get(src='zone', attr='v', idx=system.PQ.bus.v)
+    pzone = np.zeros(len(zones))
+    np.add.at(pzone, [zones.index(z) for z in lzone], system.PQ.p0.v)
+    demand = system.UCTSlot.sd.v @ pzone
+
+    t_lr = time.perf_counter_ns()
+    chunks = np.array_split(np.arange(len(gen)), max(n_workers, 1))
+    data = (c0, c1, c2, csu, csd, pmin, pmax, ug0)
+    pool = None
+    if n_workers > 1:
+        # the chunks are inherited by the forked workers, not pickled
+        parts = [tuple(x[c] for x in data) for c in chunks]
+        pool = ProcessPoolExecutor(
+            n_workers, mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_lr_worker, initargs=(parts,))
+
+    lam0 = np.median(c1 + np.where(pmax > 0, c0 / np.maximum(pmax, 1e-6), 0))
+    lam = np.full(len(demand), lam0)
+    lb, u_best, n_iter = -np.inf, None, 0
+    try:
+        for n_iter in range(1, max_iter + 1):
+            if pool is None:
+                u, p, cost = _lr_units(lam, *data)
+            else:
+                args = [(lam, k) for k in range(len(chunks))]
+                res = list(pool.map(_lr_chunk, args))
+                u = np.vstack([r[0] for r in res])
+                p = np.vstack([r[1] for r in res])
+                cost = sum(r[2] for r in res)
+
+            mismatch = demand - p.sum(axis=0)
+            dual = cost + lam @ demand
+            if dual > lb:
+                lb, u_best = dual, u
+            if np.abs(mismatch).max() <= tol * demand.max():
+                break
+            lam = lam + step * lam0 / np.sqrt(n_iter) * (
+                mismatch / np.linalg.norm(mismatch))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # commit the cheapest offline units at full output to cover the load
+    u = u_best.copy()
+    avg = c1 + np.where(pmax > 0, c0 / np.maximum(pmax, 1e-6), np.inf)
+    order = np.argsort(avg)
+    for t, d in enumerate(demand):
+        short = (1 + margin) * d - pmax @ u[:, t]
+        if short <= 0:
+            continue
+        cand = order[u[order, t] == 0]
+        need = np.searchsorted(np.cumsum(pmax[cand]), short) + 1
+        u[cand[:need], t] = 1
+    s_lr = _toc(t_lr)
+
+    # the commitment reaches ED through its parameter sourced from
+    # EDTSlot.ug, which must be updated after the alter
+    ug_params = [name for name, rp in system.ED.rparams.items()
+                 if rp.model == 'EDTSlot' and rp.src == 'ug']
+    t_ed = time.perf_counter_ns()
+    for i, edt in enumerate(system.EDTSlot.idx.v):
+        system.EDTSlot.alter(src='ug', idx=edt, value=u[:, i])
+    system.ED.update(params=ug_params)
+    system.ED.run(solver=solver)
+    s_ed = _toc(t_ed)
+
+    prev = np.hstack((ug0[:, None], u))
+    switch = np.diff(prev, axis=1)
+    ub = system.ED.obj.v + csu @ (switch > 0).sum(axis=1) \
+        + csd @ (switch < 0).sum(axis=1)
+    return dict(ugd=u, lb=lb, ub=ub, gap=(ub - lb) / abs(ub), n_iter=n_iter,
+                lr=s_lr, ed=s_ed)
+
+
+def time_uc_lr(case, solver='CLARABEL', **kwargs):
+    """
+    Time UC solved by Lagrangian relaxation with :py:func:`solve_uc_lr`.
+
+    Parameters
+    ----------
+    case : str
+        The path to the case file.
+    solver : str, optional
+        Solver of the ED. Defaults to 'CLARABEL'.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Keyword arguments of :py:func:`solve_uc_lr`.
+
+    Returns
+    -------
+    tuple
+        The times in seconds of the ``cols_pre`` stages of ED and of the
+        solution, as returned by ``test_educ`` in ``bench_educ_large``, and
+        the result of :py:func:`solve_uc_lr`.
+    """
+    system = ams.load(case, setup=True, default_config=True, no_output=True)
+    pre_time = pre_solve(system, 'ED')
+    res = solve_uc_lr(system, solver=solver, **kwargs)
+    return list(pre_time.values()) + [res['lr'] + res['ed']], res
+
+
+def _init_lf_worker(case, load_kwargs, ignore_dpp, ready=None):
+    """
+    Initialize a load-factor sweep worker.
+
+    The case is loaded and the DCOPF is built once per worker process, and
+    kept in the module-level ``_lf_worker`` for the following chunks. If
+    given, the ``ready`` barrier is waited on once the worker is set up,
+    or has failed, so the caller is not left waiting.
+    """
+    try:
+        system = ams.load(case, **load_kwargs)
+        pre_time = pre_solve(system, 'DCOPF')
+        _lf_worker.clear()
+        _lf_worker.update(system=system, pre_time=pre_time,
+                          pd0=system.PQ.p0.v.copy(), pq_idx=system.PQ.idx.v,
+                          ignore_dpp=ignore_dpp, ppn=None, p_mw0=None)
+    finally:
+        if ready is not None:
+            ready.wait()
+
+
+def _run_lf_chunk(scenarios, load_factors, solvers):
+    """
+    Solve the DCOPF of one chunk of load factors in a sweep worker.
+
+    Returns
+    -------
+    list of tuple
+        Rows of (scenario, lf, solver, time, obj, worker).
+    """
+    system = _lf_worker['system']
+    pd0 = _lf_worker['pd0']
+    pq_idx = _lf_worker['pq_idx']
+    pid = os.getpid()
+
+    rows = []
+    for solver in solvers:
+        if solver != 'pandapower':
+            for k, lf_k in zip(scenarios, load_factors):
+                system.PQ.set(src='p0', attr='v', idx=pq_idx, value=lf_k * pd0)
+                system.DCOPF.update(params=['pd'])
+                s, obj = time_routine_solve(system, 'DCOPF',
+                                            solver=solver,
+                                            ignore_dpp=_lf_worker['ignore_dpp'])
+                rows.append((k, lf_k, solver, s, obj, pid))
+            system.PQ.set(src='p0', attr='v', idx=pq_idx, value=pd0)
+        else:
+            if _lf_worker['ppn'] is None:
+                ppc = ams.io.pypower.system2ppc(system)
+                ppn = pdp.converter.from_ppc(ppc, f_hz=system.config.freq)
+                _lf_worker['ppn'] = ppn
+                _lf_worker['p_mw0'] = ppn.load['p_mw'].copy()
+            ppn = _lf_worker['ppn']
+            for k, lf_k in zip(scenarios, load_factors):
+                ppn.load['p_mw'] = lf_k * _lf_worker['p_mw0']
+                s, obj = time_pdp_dcopf(ppn)
+                rows.append((k, lf_k, solver, s, obj, pid))
+    return rows
+
+
+def _get_lf_pre_time():
+    """
+    Return the preparation times of a load-factor sweep worker.
+    """
+    return _lf_worker['pre_time']
+
+
+def time_dcopf_with_lf_parallel(case, solvers=['CLARABEL'], load_factors=[1],
+                                ignore_dpp=False, n_workers=None,
+                                chunksize=None, mp_context=None,
+                                **kwargs):
+    """
+    Time the execution of DCOPF with varying load factors using a pool of
+    worker processes.
+
+    Each worker loads ``case`` and builds the DCOPF once, then solves the
+    chunks of load factors it receives. Each load factor is solved exactly
+    as in :py:func:`time_dcopf_with_lf`, so the per-scenario objectives
+    match the serial path.
+
+    Parameters
+    ----------
+    case : str
+        The path to the case file.
+    solvers : list of str, optional
+        List of solvers to use. Defaults to ['CLARABEL'].
+    load_factors : list of float, optional
+        List of load factors to apply. Defaults to [1].
+    ignore_dpp : bool, optional
+        Whether to ignore DPP.
+    n_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunksize : int, optional
+        Number of load factors per task. Defaults to an even split of the
+        load factors over four tasks per worker.
+    mp_context : str, optional
+        Multiprocessing start method. Defaults to 'fork' where available,
+        so the pool also works when this file is loaded by ``%run``.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Keyword arguments passed to ``ams.load``. Defaults to
+        ``setup=True, no_output=True, default_config=True``.
+
+    Returns
+    -------
+    tuple
+        A tuple containing a DataFrame of the preparation times of one
+        worker, a DataFrame of the per-scenario results with columns
+        ``cols_lf``, and the wall time of the sweep in seconds, from when
+        every worker is set up.
+    """
+    load_kwargs = dict(setup=True, no_output=True, default_config=True)
+    load_kwargs.update(kwargs)
+
+    load_factors = np.asarray(load_factors, dtype=float).ravel()
+    n_lf = len(load_factors)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, n_lf))
+    if chunksize is None:
+        chunksize = max(1, int(np.ceil(n_lf / (4 * n_workers))))
+
+    if mp_context is None:
+        methods = multiprocessing.get_all_start_methods()
+        mp_context = 'fork' if 'fork' in methods else None
+    ctx = multiprocessing.get_context(mp_context)
+
+    scenarios = np.arange(n_lf)
+    chunks = [(scenarios[i:i + chunksize].tolist(),
+               load_factors[i:i + chunksize].tolist())
+              for i in range(0, n_lf, chunksize)]
+
+    # the sweep is timed once all workers have loaded the case, which is
+    # waited for with one task per worker and a barrier in the initializer
+    t_init = time.perf_counter_ns()
+    ready = ctx.Barrier(n_workers + 1)
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx,
+                             initializer=_init_lf_worker,
+                             initargs=(case, load_kwargs, ignore_dpp,
+                                       ready)) as pool:
+        warmup = [pool.submit(_get_lf_pre_time) for _ in range(n_workers)]
+        ready.wait()
+        pre_time = [fut.result() for fut in warmup][0]
+        logger.info(f'Workers set up in {_toc(t_init):.4f} s.')
+
+        t_all = time.perf_counter_ns()
+        futures = [pool.submit(_run_lf_chunk, sc, lf, solvers)
+                   for sc, lf in chunks]
+        rows = [row for fut in futures for row in fut.result()]
+        s_all = _toc(t_all)
+
+    sol = pd.DataFrame(rows, columns=cols_lf)
+    sol = sol.sort_values(['solver', 'scenario'], ignore_index=True)
+    pre_time = pd.DataFrame([pre_time], columns=cols_pre)
+    return pre_time, sol, s_all
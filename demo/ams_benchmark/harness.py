@@ -0,0 +1,523 @@
+"""
+Benchmark harness with warm-up, repetitions and robust statistics.
+
+Run as a script to benchmark OPF cases without the notebooks, e.g.,
+
+.. code-block :: bash
+
+    python harness.py opf/cases/case14.m opf/cases/case39.m \\
+        --solvers GUROBI MOSEK PIQP pandapower --repeat 10 \\
+        --out results/results_time.csv
+
+The CSV files keep the layout of ``results/results_time.csv`` and
+``results/results_obj.csv``, with the median times in ms. The JSON file
+beside the time CSV holds the full statistics, the peak resident set size
+of each stage, and the tool versions.
+
+With ``--baseline``, the run is compared with stored results, e.g.,
+``--baseline results/results_time.csv``, and the exit code is 1 if a stage
+got slower or failed; ``--history`` appends the run with its tool versions
+to a JSON lines file.
+"""
+
+import os
+import sys
+import json
+import argparse
+import datetime
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import ams
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks import (cols_pre, _failed_time, _failed_obj,  # noqa: E402
+                        get_tool_versions, time_routine, time_dcopf_with_lf)
+
+logger = logging.getLogger(__name__)
+
+# resamples of the bootstrap confidence interval of the median
+_n_boot = 2000
+
+cols_stats = ['n', 'failed', 'median', 'q1', 'q3', 'iqr', 'ci_lo', 'ci_hi',
+              'mean', 'min', 'max']
+
+
+def summarize(samples, ci=0.95, seed=0):
+    """
+    Robust statistics of a sample of times.
+
+    Failed samples, marked by ``_failed_time`` or NaN, are counted in
+    'failed' and left out of the statistics.
+
+    Parameters
+    ----------
+    samples : array-like
+        The times.
+    ci : float, optional
+        Level of the bootstrap confidence interval of the median.
+    seed : int, optional
+        Seed of the bootstrap.
+
+    Returns
+    -------
+    dict
+        Statistics in ``cols_stats``.
+    """
+    x = np.asarray(samples, dtype=float)
+    bad = np.isnan(x) | (x == _failed_time)
+    x = x[~bad]
+    out = dict.fromkeys(cols_stats, np.nan)
+    out.update(n=len(x), failed=int(bad.sum()))
+    if len(x) == 0:
+        return out
+
+    q1, med, q3 = np.percentile(x, [25, 50, 75])
+    rng = np.random.default_rng(seed)
+    boot = np.median(rng.choice(x, size=(_n_boot, len(x))), axis=1)
+    lo, hi = np.percentile(boot, [50 * (1 - ci), 50 * (1 + ci)])
+    out.update(median=med, q1=q1, q3=q3, iqr=q3 - q1, ci_lo=lo, ci_hi=hi,
+               mean=x.mean(), min=x.min(), max=x.max())
+    return out
+
+
+def bench_case(case, routine='DCOPF', solvers=['CLARABEL'], warmup=1,
+               repeat=10, load_factors=None, ignore_dpp=True,
+               big_rate=4000, concurrent=False, timeout=None):
+    """
+    Time the preparation and the solvers of a routine over repetitions.
+
+    Parameters
+    ----------
+    case : str
+        Path to the case file.
+    routine : str, optional
+        The name of the routine. Defaults to 'DCOPF'.
+    solvers : list of str, optional
+        List of solvers to use.
+    warmup : int, optional
+        Number of untimed runs ahead of the repetitions.
+    repeat : int, optional
+        Number of timed runs.
+    load_factors : list of float, optional
+        If given, time DCOPF over these load factors with
+        ``time_dcopf_with_lf`` instead of ``time_routine``.
+    ignore_dpp : bool, optional
+        Whether to ignore DPP.
+    big_rate : int, optional
+        Relax the line ratings of cases with more buses than this, as in
+        ``bench_opf.ipynb``.
+    concurrent : bool, optional
+        Run the solvers concurrently, see ``time_routine``. Not used with
+        ``load_factors``.
+    timeout : float, optional
+        Timeout in seconds of the concurrent solvers.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per repetition and stage with columns 'rep', 'stage',
+        'time' (s), 'obj' and 'rss' (bytes). Failed runs have a NaN time.
+    """
+    system = ams.load(case, setup=True, default_config=True, no_output=True)
+    if system.Bus.n > big_rate:
+        system.Line.set(src='rate_a', attr='v',
+                        idx=system.Line.idx.v, value=99999)
+
+    rows = []
+    for k in range(warmup + repeat):
+        rss = {}
+        if load_factors is None:
+            pre_time, sol = time_routine(system, routine=routine,
+                                         solvers=solvers, rss=rss,
+                                         concurrent=concurrent,
+                                         timeout=timeout,
+                                         ignore_dpp=ignore_dpp)
+        else:
+            pre_time, sol = time_dcopf_with_lf(system, solvers=solvers,
+                                               load_factors=load_factors,
+                                               ignore_dpp=ignore_dpp, rss=rss)
+        if k < warmup:
+            continue
+        for stage, t in pre_time.items():
+            rows.append(dict(rep=k - warmup, stage=stage, time=t, obj=np.nan,
+                             rss=rss.get(stage, np.nan)))
+        for solver in solvers:
+            t, obj = sol[solver]['time'], sol[solver]['obj']
+            failed = t == _failed_time
+            rows.append(dict(rep=k - warmup, stage=solver,
+                             time=np.nan if failed else t,
+                             obj=np.nan if obj == _failed_obj else obj,
+                             rss=rss.get(solver, np.nan)))
+    return pd.DataFrame(rows)
+
+
+def run_suite(cases, names=None, **kwargs):
+    """
+    Run :py:func:`bench_case` over cases and summarize each stage.
+
+    Parameters
+    ----------
+    cases : list of str
+        Paths to the case files.
+    names : list of str, optional
+        Names of the cases. Defaults to the file names without extension.
+
+    Other Parameters
+    ----------------
+    load_factors : dict, optional
+        Load factors by case name. Cases without an entry use
+        ``time_routine``.
+    **kwargs
+        Keyword arguments of :py:func:`bench_case`.
+
+    Returns
+    -------
+    tuple
+        The samples of all cases, and the statistics indexed by case and
+        stage, with 'obj' and 'rss' columns of the last objective and the
+        largest peak resident set size.
+    """
+    if names is None:
+        names = [os.path.splitext(os.path.basename(c))[0] for c in cases]
+    lfs = kwargs.pop('load_factors', None) or {}
+
+    samples = []
+    for name, case in zip(names, cases):
+        logger.warning(f'Case: {name}')
+        df = bench_case(case, load_factors=lfs.get(name), **kwargs)
+        df.insert(0, 'case', name)
+        samples.append(df)
+    samples = pd.concat(samples, ignore_index=True)
+
+    stats = {}
+    for (name, stage), df in samples.groupby(['case', 'stage'], sort=False):
+        stats[(name, stage)] = dict(**summarize(df['time']),
+                                    obj=df['obj'].iloc[-1],
+                                    rss=df['rss'].max())
+    stats = pd.DataFrame.from_dict(stats, orient='index')
+    stats.index.names = ['case', 'stage']
+    return samples, stats
+
+
+def to_results(stats, stat='median', scale=1000):
+    """
+    Reshape statistics into the layout of ``results/results_time.csv``,
+    one row per case and one column per stage.
+
+    Parameters
+    ----------
+    stats : pd.DataFrame
+        Statistics from :py:func:`run_suite`.
+    stat : str, optional
+        Column of the statistics to report, e.g., 'obj'.
+    scale : float, optional
+        Factor of the values, 1000 for times in ms.
+    """
+    out = stats[stat].unstack('stage') * scale
+    stages = stats.index.get_level_values('stage').unique()
+    out = out.loc[stats.index.get_level_values('case').unique(), stages]
+    out.index.name = out.columns.name = None
+    return out
+
+
+def write(stats, out, obj_out=None, meta=None):
+    """
+    Write the median times in ms to ``out`` as CSV, the objectives to
+    ``obj_out``, and the statistics with ``meta`` to JSON beside ``out``.
+    """
+    to_results(stats).to_csv(out)
+    if obj_out is not None:
+        solvers = [s for s in stats.index.get_level_values('stage').unique()
+                   if s not in cols_pre]
+        to_results(stats, stat='obj', scale=1)[solvers].to_csv(obj_out)
+
+    records = stats.reset_index().replace({np.nan: None})
+    data = dict(meta=meta or {}, stats=records.to_dict(orient='records'))
+    with open(os.path.splitext(out)[0] + '.json', 'w') as f:
+        json.dump(data, f, indent=1)
+
+
+def read_baseline(path, scale=1):
+    """
+    Read stored results as a baseline for :py:func:`compare`.
+
+    Two CSV layouts are read: one row per case and one column per stage,
+    as ``results/results_time.csv``, and one row per stage with a 'time'
+    column of stage names and one column per case or routine, as
+    ``results/results_educ_large.csv``. If a JSON file written by
+    :py:func:`write` is beside the CSV file, its IQR and confidence
+    intervals are kept too.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    scale : float, optional
+        Factor to convert the values to ms, e.g., 1000 for seconds.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns 'median', 'iqr', 'ci_lo' and 'ci_hi' in ms, indexed by case
+        and stage. 'iqr' and the interval are NaN without the JSON file.
+    """
+    df = pd.read_csv(path, index_col=0)
+    if 'time' in df.columns:
+        # rows of the objective and the gap are not stages
+        df = df.set_index('time').drop(['obj', 'gap'], errors='ignore').T
+    base = df.stack().astype(float).to_frame('median') * scale
+    base.index.names = ['case', 'stage']
+    base[['iqr', 'ci_lo', 'ci_hi']] = np.nan
+
+    stats_file = os.path.splitext(path)[0] + '.json'
+    if os.path.isfile(stats_file):
+        with open(stats_file) as f:
+            records = json.load(f)['stats']
+        js = pd.DataFrame(records).set_index(['case', 'stage'])
+        js = js[['iqr', 'ci_lo', 'ci_hi']].astype(float) * 1000
+        base.update(js)
+    return base
+
+
+def baseline_mode(path):
+    """
+    Solver mode of stored results, 'concurrent' or 'sequential'.
+
+    The mode is read from the meta of the JSON file written by
+    :py:func:`write` beside the CSV file. Results without it, such as those
+    of the notebooks, are sequential.
+    """
+    stats_file = os.path.splitext(path)[0] + '.json'
+    if not os.path.isfile(stats_file):
+        return 'sequential'
+    with open(stats_file) as f:
+        meta = json.load(f).get('meta', {})
+    return meta.get('mode', 'sequential')
+
+
+def compare(stats, baseline, rel_tol=0.1, abs_tol=1.0, k_iqr=1.5,
+            aliases=None, max_failed=0.0):
+    """
+    Compare the median times of a run with a baseline.
+
+    A stage is 'slower' or 'faster' when its median moves by more than a
+    threshold, the largest of ``rel_tol`` of the baseline, ``abs_tol``,
+    and ``k_iqr`` times the IQR of the run or of the baseline, so noisy
+    stages need a larger change. When both have confidence intervals, the
+    intervals must not overlap either. A stage is 'failed' when more than
+    ``max_failed`` of its samples failed, whatever its median.
+
+    Parameters
+    ----------
+    stats : pd.DataFrame
+        Statistics from :py:func:`run_suite`.
+    baseline : pd.DataFrame
+        Baseline from :py:func:`read_baseline`.
+    rel_tol : float, optional
+        Relative threshold.
+    abs_tol : float, optional
+        Absolute threshold, ms.
+    k_iqr : float, optional
+        Factor of the IQR in the threshold.
+    aliases : dict, optional
+        Stage names of the baseline mapped to those of the run, e.g.,
+        ``{'ams_solver': 'GUROBI'}``.
+    max_failed : float, optional
+        Largest fraction of failed samples of a stage that is not reported
+        as 'failed'. Defaults to 0, any failed sample.
+
+    Cases of the baseline that are not in the run are skipped.
+
+    Returns
+    -------
+    pd.DataFrame
+        'base', 'new' and 'threshold' in ms, 'ratio' and 'status', one of
+        'ok', 'slower', 'faster', 'failed' or 'missing', indexed by case and
+        stage of the baseline.
+    """
+    new = stats[['n', 'failed', 'median', 'iqr', 'ci_lo', 'ci_hi']].copy()
+    new[['median', 'iqr', 'ci_lo', 'ci_hi']] *= 1000
+    aliases = aliases or {}
+
+    cases = set(new.index.get_level_values('case'))
+    rows = {}
+    for (case, stage), b in baseline.iterrows():
+        if case not in cases:
+            continue
+        key = (case, aliases.get(stage, stage))
+        row = dict(base=b['median'], new=np.nan, threshold=np.nan,
+                   ratio=np.nan, status='missing')
+        if key in new.index:
+            n = new.loc[key]
+            iqr = np.nanmax([n['iqr'], b['iqr'], 0.0])
+            thr = max(rel_tol * b['median'], abs_tol, k_iqr * iqr)
+            diff = n['median'] - b['median']
+            ratio = n['median'] / b['median'] if b['median'] else np.nan
+            row.update(new=n['median'], threshold=thr, ratio=ratio)
+            # without intervals, the threshold alone decides
+            separated = (np.isnan(b['ci_lo']) or np.isnan(n['ci_lo'])
+                         or n['ci_lo'] > b['ci_hi'] or b['ci_lo'] > n['ci_hi'])
+            rate = n['failed'] / max(n['n'] + n['failed'], 1)
+            if np.isnan(n['median']) or rate > max_failed:
+                row['status'] = 'failed'
+            elif diff > thr and separated:
+                row['status'] = 'slower'
+            elif -diff > thr and separated:
+                row['status'] = 'faster'
+            else:
+                row['status'] = 'ok'
+        rows[(case, stage)] = row
+    out = pd.DataFrame.from_dict(rows, orient='index')
+    out.index.names = ['case', 'stage']
+    return out
+
+
+def record(path, meta, stats, report=None):
+    """
+    Append a run to a JSON lines history, with its tool versions, the
+    median time of each stage in ms and the statuses of the comparison, so
+    that a regression can be bisected to a package version.
+    """
+    medians = (stats['median'] * 1000).replace({np.nan: None})
+    entry = dict(meta,
+                 medians={f'{c}/{s}': v for (c, s), v in medians.items()})
+    if report is not None:
+        entry['status'] = {f'{c}/{s}': v
+                           for (c, s), v in report['status'].items()}
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def _read_lfs(path, names, columns=None):
+    """
+    Load factors by case name from a CSV file with one column per case,
+    such as ``opf/lfs_data.csv``.
+
+    ``columns`` maps case names to the columns of other names, e.g.,
+    ``{'case5': 'pglib_opf_case5_pjm'}``. A case without a column raises a
+    ``ValueError``, rather than falling back to a single solve.
+    """
+    if path is None:
+        return None
+    df = pd.read_csv(path)
+    columns = columns or {}
+    cols = {name: columns.get(name, name) for name in names}
+    missing = [f'{name} ({col})' if col != name else name
+               for name, col in cols.items() if col not in df.columns]
+    if missing:
+        raise ValueError(f'No load factors in {path} for: '
+                         f'{", ".join(missing)}. Columns are: '
+                         f'{", ".join(df.columns)}; map them with --lfs-map.')
+    return {name: df[col].values for name, col in cols.items()}
+
+
+def _parser():
+    p = argparse.ArgumentParser(description='Benchmark AMS routines.')
+    p.add_argument('cases', nargs='+', help='case files')
+    p.add_argument('--names', nargs='+', help='case names')
+    p.add_argument('--routine', default='DCOPF')
+    p.add_argument('--solvers', nargs='+', default=['CLARABEL'])
+    p.add_argument('--warmup', type=int, default=1)
+    p.add_argument('--repeat', type=int, default=10)
+    p.add_argument('--lfs', help='CSV of load factors, one column per case')
+    p.add_argument('--lfs-map', nargs='+', default=[],
+                   help='case mapped to a column of --lfs, as CASE=COLUMN')
+    p.add_argument('--dpp', action='store_true',
+                   help='keep DPP, as in bench_opf_repeat.ipynb')
+    p.add_argument('--out', default='results_time.csv',
+                   help='CSV of the median times, with the JSON beside it')
+    p.add_argument('--obj-out', help='CSV of the objectives')
+    p.add_argument('--concurrent', action='store_true',
+                   help='run the solvers concurrently')
+    p.add_argument('--timeout', type=float,
+                   help='timeout of the concurrent solvers, s')
+    p.add_argument('--big-rate', type=int, default=4000,
+                   help='relax the line ratings of cases with more buses')
+
+    g = p.add_argument_group('regression check')
+    g.add_argument('--baseline', help='stored results CSV to compare with')
+    g.add_argument('--baseline-scale', type=float, default=1,
+                   help='factor to convert the baseline to ms')
+    g.add_argument('--rel-tol', type=float, default=0.1)
+    g.add_argument('--abs-tol', type=float, default=1.0, help='ms')
+    g.add_argument('--k-iqr', type=float, default=1.5)
+    g.add_argument('--max-failed', type=float, default=0.0,
+                   help='fraction of failed samples allowed per stage')
+    g.add_argument('--alias', nargs='+', default=[],
+                   help='baseline stage mapped to a run stage, as OLD=NEW')
+    g.add_argument('--history', help='JSON lines file to append the run to')
+    return p
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+
+    ams.config_logger(stream_level=50)
+    logging.getLogger('pandapower').setLevel(logging.ERROR)
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    warnings.filterwarnings('ignore')
+
+    # concurrent solvers share the CPU, so their times are only compared
+    # with a baseline of the same mode
+    mode = 'concurrent' if args.concurrent else 'sequential'
+    if args.baseline is not None:
+        base_mode = baseline_mode(args.baseline)
+        if base_mode != mode:
+            logger.error(f'The run is {mode} but {args.baseline} is '
+                         f'{base_mode}; their times are not comparable.')
+            return 2
+
+    versions = get_tool_versions()
+    names = args.names
+    if names is None:
+        names = [os.path.splitext(os.path.basename(c))[0] for c in args.cases]
+
+    _, stats = run_suite(args.cases, names=names, routine=args.routine,
+                         solvers=args.solvers, warmup=args.warmup,
+                         repeat=args.repeat, ignore_dpp=not args.dpp,
+                         concurrent=args.concurrent, timeout=args.timeout,
+                         big_rate=args.big_rate,
+                         load_factors=_read_lfs(
+                             args.lfs, names,
+                             dict(m.split('=', 1) for m in args.lfs_map)))
+
+    meta = dict(time=datetime.datetime.now().isoformat(timespec='seconds'),
+                python=sys.version, versions=versions, argv=sys.argv[1:],
+                mode=mode, timeout=args.timeout)
+    write(stats, args.out, obj_out=args.obj_out, meta=meta)
+    print(to_results(stats).round(2).to_string())
+
+    report = None
+    if args.baseline is not None:
+        baseline = read_baseline(args.baseline, scale=args.baseline_scale)
+        aliases = dict(a.split('=', 1) for a in args.alias)
+        report = compare(stats, baseline, rel_tol=args.rel_tol,
+                         abs_tol=args.abs_tol, k_iqr=args.k_iqr,
+                         aliases=aliases, max_failed=args.max_failed)
+        flagged = report[report['status'] != 'ok']
+        if len(flagged):
+            print(f'\nAgainst {args.baseline}:')
+            print(flagged.round(2).to_string())
+        else:
+            print(f'\nNo change against {args.baseline}.')
+        missing = report.index[report['status'] == 'missing']
+        if len(missing):
+            logger.warning('Stages of the baseline not in the run: '
+                           + ', '.join(f'{c}/{s}' for c, s in missing))
+    if args.history is not None:
+        record(args.history, meta, stats, report)
+
+    # a stage that failed is a regression too
+    if report is not None and report['status'].isin(['slower',
+                                                     'failed']).any():
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Monte Carlo ensemble of stochastic disturbance TDS.
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from noise import LoadNoise
+
+logger = logging.getLogger(__name__)
+
+# initialized system shared with the forked workers
+_ens = {}
+
+
+class Monitor:
+    """
+    On-the-fly reduction of the center-of-inertia frequency of one TDS run.
+
+    Instead of keeping the trajectories, it tracks the frequency nadir and
+    zenith, the ROCOF extremes, and the frequency and ROCOF envelopes in
+    ``nbin`` time bins. ``update`` is called by the pert file at each step.
+
+    Parameters
+    ----------
+    system : andes.system.System
+        The system object, after ``TDS.init``.
+    tf : float
+        End time of the simulation, s.
+    nbin : int, optional
+        Number of time bins of the envelopes.
+    """
+
+    def __init__(self, system, tf, nbin=100):
+        self.system = system
+        self.fn = system.config.freq
+        syn = system.GENROU
+        self.omega_a = np.array(syn.omega.a, dtype=int)
+        w = syn.M.v * syn.Sn.v * syn.u.v
+        self.w = w / w.sum()
+
+        self.tbin = tf / nbin
+        self.nbin = nbin
+        self.fmin = np.full(nbin, np.inf)
+        self.fmax = np.full(nbin, -np.inf)
+        self.rmin = np.full(nbin, np.inf)
+        self.rmax = np.full(nbin, -np.inf)
+
+        self.t0 = None
+        self.f0 = None
+        self.nadir = (np.inf, 0.0)      # (frequency, time)
+        self.zenith = (-np.inf, 0.0)
+
+    def update(self, t):
+        """
+        Update the statistics with the state at time ``t``.
+        """
+        f = self.fn * (self.w @ self.system.dae.x[self.omega_a])
+        k = min(int(t / self.tbin), self.nbin - 1)
+        if f < self.fmin[k]:
+            self.fmin[k] = f
+            if f < self.nadir[0]:
+                self.nadir = (f, t)
+        if f > self.fmax[k]:
+            self.fmax[k] = f
+            if f > self.zenith[0]:
+                self.zenith = (f, t)
+        if self.t0 is not None and t > self.t0:
+            rocof = (f - self.f0) / (t - self.t0)
+            self.rmin[k] = min(self.rmin[k], rocof)
+            self.rmax[k] = max(self.rmax[k], rocof)
+        self.t0 = t
+        self.f0 = f
+
+    def result(self):
+        """
+        Scalar statistics and envelopes of the run.
+        """
+        stats = dict(nadir=self.nadir[0], t_nadir=self.nadir[1],
+                     zenith=self.zenith[0], t_zenith=self.zenith[1],
+                     rocof_min=self.rmin.min(), rocof_max=self.rmax.max())
+        env = np.vstack((self.fmin, self.fmax, self.rmin, self.rmax))
+        return stats, env
+
+
+def _run_realization(scenario):
+    """
+    Run one realization in a worker forked from the initialized system.
+    """
+    system = _ens['system']
+    tf = _ens['tf']
+
+    t0 = time.perf_counter()
+    system.noise = LoadNoise(system, tf=tf, dt=system.TDS.config.tstep,
+                             seed=_ens['seed'], scenario=scenario,
+                             **_ens['noise_kw'])
+    system.monitor = Monitor(system, tf, nbin=_ens['nbin'])
+
+    system.TDS.config.tf = tf
+    system.TDS.config.no_tqdm = True
+    system.TDS.config.save_every = 0    # do not keep trajectories
+    system.TDS.run()
+
+    stats, env = system.monitor.result()
+    stats.update(scenario=scenario, converged=system.exit_code == 0,
+                 time=time.perf_counter() - t0)
+    return stats, env
+
+
+def run_ensemble(system, n, tf, seed=0, n_workers=None, nbin=100,
+                 percentiles=(5, 50, 95), **noise_kw):
+    """
+    Run ``n`` seeded realizations of a stochastic disturbance TDS in
+    parallel.
+
+    The system is loaded and initialized once by the caller. Each
+    realization runs in a worker process forked from this initialized
+    state, so the case is not reloaded or re-initialized. The pert file of
+    the system needs to call ``system.noise.apply(t)`` and
+    ``system.monitor.update(t)``.
+
+    Parameters
+    ----------
+    system : andes.system.System
+        The system object, after ``TDS.init``.
+    n : int
+        Number of realizations.
+    tf : float
+        End time of the simulation, s.
+    seed : int, optional
+        Seed of the study. Realization ``k`` uses scenario ``k``.
+    n_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    nbin : int, optional
+        Number of time bins of the envelopes.
+    percentiles : tuple of float, optional
+        Percentiles of the envelopes across realizations.
+
+    Other Parameters
+    ----------------
+    **noise_kw
+        Keyword arguments of ``LoadNoise``, such as ``kind`` and ``scale``.
+
+    Returns
+    -------
+    summary : pd.DataFrame
+        Statistics of each realization.
+    envelope : pd.DataFrame
+        Percentiles across realizations of the binned frequency and ROCOF
+        envelopes, indexed by the bin start time.
+    perf : dict
+        Wall time, realizations per second, and realizations per second
+        per core.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        raise RuntimeError('Ensemble TDS requires the fork start method.')
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    _ens.clear()
+    _ens.update(system=system, tf=tf, seed=seed, nbin=nbin,
+                noise_kw=noise_kw)
+
+    ctx = multiprocessing.get_context('fork')
+    t0 = time.perf_counter()
+    # a fresh fork per realization restarts from the initialized state
+    with ctx.Pool(n_workers, maxtasksperchild=1) as pool:
+        res = pool.map(_run_realization, range(n), chunksize=1)
+    wall = time.perf_counter() - t0
+
+    summary = pd.DataFrame([r[0] for r in res]).set_index('scenario')
+    n_fail = int((~summary['converged']).sum())
+    if n_fail > 0:
+        logger.warning(f'{n_fail} of {n} realizations did not converge.')
+
+    env = np.stack([r[1] for r in res])
+    q = np.percentile(env, percentiles, axis=0)
+    index = pd.Index(np.arange(nbin) * tf / nbin, name='t')
+    envelope = pd.DataFrame(index=index)
+    for k, name in enumerate(['f_min', 'f_max', 'rocof_min', 'rocof_max']):
+        for p, qp in zip(percentiles, q):
+            envelope[f'{name}_p{p:g}'] = qp[k]
+
+    perf = dict(wall=wall, n=n, n_workers=n_workers,
+                rate=n / wall, rate_per_core=n / wall / n_workers)
+    logger.info(f'{n} realizations in {wall:.1f} s, '
+                f'{perf["rate_per_core"]:.3f} realizations/s/core.')
+    return summary, envelope, perf
@@ -0,0 +1,127 @@
+"""
+Stochastic load disturbance with pre-drawn noise.
+"""
+
+import numpy as np
+from scipy.signal import butter, lfilter, sosfiltfilt
+
+
+class LoadNoise:
+    """
+    Stochastic disturbance on the active power of a set of PQ loads.
+
+    The noise of all loads over the whole simulation is drawn once as a
+    matrix of shape ``(nstep + 1, nload)`` from a seeded generator. At each
+    step, ``apply`` looks up the row of the current time and writes
+    ``PQ.Ppf`` of all loads in one vectorized assignment.
+
+    The same ``seed`` and ``scenario`` always give the same noise, and
+    different ``scenario`` numbers give independent streams, so Monte Carlo
+    batches can be reproduced and compared.
+
+    Parameters
+    ----------
+    system : andes.system.System
+        The system object, after ``TDS.init``.
+    tf : float
+        End time of the simulation, s.
+    dt : float
+        Time step of the noise, s, usually ``TDS.config.tstep``.
+    idx : list, optional
+        idx of the disturbed PQ loads. Defaults to all loads.
+    kind : str, optional
+        ``'white'`` for independent samples at each step, ``'ou'`` for an
+        Ornstein-Uhlenbeck process with time constant ``tau``, or ``'band'``
+        for white noise low-pass filtered at ``fc``.
+    scale : float or array-like, optional
+        Standard deviation of the noise of each load, p.u.
+    tau : float, optional
+        Correlation time of the OU process, s.
+    fc : float, optional
+        Cut-off frequency of the band-limited noise, Hz.
+    corr : float or array-like, optional
+        Correlation between loads, either one coefficient for all pairs or
+        an ``(nload, nload)`` correlation matrix. Defaults to independent.
+    seed : int, optional
+        Seed of the study.
+    scenario : int, optional
+        Scenario number, combined with ``seed`` into the generator seed.
+    """
+
+    def __init__(self, system, tf, dt, idx=None, kind='ou', scale=0.02,
+                 tau=1.0, fc=1.0, corr=0.0, seed=None, scenario=0):
+        self.system = system
+        self.idx = list(system.PQ.idx.v) if idx is None else list(idx)
+        self.uid = np.array(system.PQ.idx2uid(self.idx), dtype=int)
+        self.p0 = system.PQ.p0.v[self.uid].copy()
+
+        self.tf = tf
+        self.dt = dt
+        self.nstep = int(np.ceil(tf / dt))
+        self.kind = kind
+        self.scale = scale
+        self.tau = tau
+        self.fc = fc
+        self.corr = corr
+        self.seed = seed
+
+        self.noise = None
+        self.generate(scenario)
+
+    def _innovation(self, rng):
+        """
+        Standard normal innovations with the load correlation applied.
+        """
+        nload = len(self.uid)
+        z = rng.standard_normal((self.nstep + 1, nload))
+        if np.isscalar(self.corr):
+            if self.corr == 0:
+                return z
+            corr = np.full((nload, nload), float(self.corr))
+            np.fill_diagonal(corr, 1.0)
+        else:
+            corr = np.asarray(self.corr, dtype=float)
+        return z @ np.linalg.cholesky(corr).T
+
+    def generate(self, scenario=0):
+        """
+        Draw the noise matrix of one scenario.
+
+        Parameters
+        ----------
+        scenario : int, optional
+            Scenario number.
+        """
+        self.scenario = scenario
+        entropy = None if self.seed is None else [self.seed, scenario]
+        rng = np.random.default_rng(entropy)
+        z = self._innovation(rng)
+
+        if self.kind == 'white':
+            noise = z
+        elif self.kind == 'ou':
+            # exact discretization of the stationary OU process
+            a = np.exp(-self.dt / self.tau)
+            noise, _ = lfilter([np.sqrt(1 - a ** 2)], [1, -a], z[1:], axis=0,
+                               zi=a * z[:1])
+            noise = np.vstack((z[:1], noise))
+        elif self.kind == 'band':
+            wn = min(2 * self.fc * self.dt, 0.99)
+            noise = sosfiltfilt(butter(4, wn, output='sos'), z, axis=0)
+            noise /= noise.std(axis=0, keepdims=True)
+        else:
+            raise ValueError(f'Unknown noise kind <{self.kind}>.')
+
+        self.noise = noise * np.asarray(self.scale, dtype=float)
+
+    def apply(self, t):
+        """
+        Set ``PQ.Ppf`` of the disturbed loads at time ``t``.
+
+        Parameters
+        ----------
+        t : float
+            Simulation time.
+        """
+        k = min(int(t / self.dt + 0.5), self.nstep)
+        self.system.PQ.Ppf.v[self.uid] = self.p0 + self.noise[k]
@@ -2,7 +2,6 @@
 A pert file template.
 """
 
-import numpy as np
 
 def pert(t, system):
     """
@@ -41,11 +40,11 @@ def pert(t, system):
     # NOTE: in ANDES, PQ.p0 is a parameter and its value can be altered as necessary
     #  When they are set as constant load, their values remain unchanged
 
-    # original value
-    p0 = system.PQ.get(src='p0', attr='v', idx='PQ_1')
+    # the noise of all loads is pre-drawn, and the row of this step is
+    # written to PQ.Ppf at once
+    system.noise.apply(t)
 
-    # a random perturbation in load active power
-    dp = np.random.normal(loc=0, scale=0.02)
-
-    # update the active power of the load
-    system.PQ.set(src='Ppf', attr='v', idx='PQ_1', value=p0 + dp)
+    # on-the-fly statistics of ensemble runs, see ``ensemble.py``
+    monitor = getattr(system, 'monitor', None)
+    if monitor is not None:
+        monitor.update(t)
@@ -0,0 +1,246 @@
+"""
+Cached index resolution and line current operator for pert files.
+"""
+
+import numpy as np
+import scipy.sparse as sps
+
+from andes.thirdparty.npfunc import safe_div
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _polar_matvec(indptr, indices, data, vm, va, vbuf, out):
+    """
+    Compute ``out = Y @ (vm * exp(1j * va))`` for a CSR matrix ``Y``.
+    """
+    for j in range(vm.shape[0]):
+        vbuf[j] = vm[j] * complex(np.cos(va[j]), np.sin(va[j]))
+    for i in range(out.shape[0]):
+        acc = 0j
+        for k in range(indptr[i], indptr[i + 1]):
+            acc += data[k] * vbuf[indices[k]]
+        out[i] = acc
+    return out
+
+
+if njit is not None:
+    _polar_matvec = njit(cache=True)(_polar_matvec)
+
+
+class LineCurrentOperator:
+    """
+    Sparse operator from bus voltage phasors to bus current injections of
+    the line series branches.
+
+    With the incidence matrix ``Cft`` of the online lines and the series
+    admittance ``ys = 1 / (r + 1j * x)``, the line currents injected to the
+    buses are ``Cft @ (ys * (V1 - V2)) = Y @ V``, where
+    ``Y = Cft @ diag(ys) @ Cft.T`` is built for the line status ``u`` at
+    construction. :py:class:`InjectionCache` builds a new operator when
+    the status changes.
+
+    Parameters
+    ----------
+    system : andes.system.System
+        The system object.
+    bus1, bus2 : np.ndarray
+        Positions of the line terminal buses.
+    use_numba : bool, optional
+        Use the Numba kernel when Numba is installed.
+    """
+
+    def __init__(self, system, bus1, bus2, use_numba=True):
+        nb = system.Bus.n
+        nl = system.Line.n
+        line = system.Line
+
+        ys = safe_div(np.ones(nl, dtype=complex), line.r.v + 1j * line.x.v)
+        ys = ys * line.u.v
+
+        lines = np.arange(nl)
+        cft = sps.csr_matrix((np.r_[np.ones(nl), -np.ones(nl)],
+                              (np.r_[bus1, bus2], np.r_[lines, lines])),
+                             shape=(nb, nl))
+        self.Y = (cft @ sps.diags(ys) @ cft.T).tocsr()
+        self.Y.sort_indices()
+
+        self.use_numba = use_numba and njit is not None
+        self._vbuf = np.zeros(nb, dtype=complex)
+
+    def __call__(self, vm, va, out=None):
+        """
+        Bus current injections of the line series branches.
+
+        Parameters
+        ----------
+        vm, va : np.ndarray
+            Bus voltage magnitudes and angles in rad.
+        out : np.ndarray, optional
+            Complex output vector of length ``nb``.
+        """
+        if out is None:
+            out = np.empty(self.Y.shape[0], dtype=complex)
+        if self.use_numba:
+            return _polar_matvec(self.Y.indptr, self.Y.indices, self.Y.data,
+                                 vm, va, self._vbuf, out)
+
+        np.multiply(1j, va, out=self._vbuf)
+        np.exp(self._vbuf, out=self._vbuf)
+        self._vbuf *= vm
+        out[:] = self.Y @ self._vbuf
+        return out
+
+
+class InjectionCache:
+    """
+    Integer positions of the bus current injection quantities.
+
+    The idx-based lookups of the pert file, i.e., ``SynGen.find_idx``,
+    ``RenGen.find_idx`` and ``Bus.get(idx=Line.bus1.v)``, are resolved once
+    into addresses of ``dae.x``/``dae.y`` and bus positions. Values at each
+    step are then read by NumPy fancy indexing on the ``dae`` arrays.
+
+    The positions and the line current operator are resolved on the first
+    ``update`` after ``TDS.init``, and again after ``invalidate`` is called
+    or ``system.TDS.custom_event`` is raised by a pert file. Timed events
+    such as ``Toggle`` and ``Fault`` are applied by TDS without that flag,
+    so ``update`` also compares ``Line.u`` with its value at the last
+    build, and rebuilds the line current operator when a line switched.
+
+    Parameters
+    ----------
+    system : andes.system.System
+        The system object.
+    groups : tuple of str, optional
+        Generator groups whose ``Id`` and ``Iq`` are injected to buses.
+    use_numba : bool, optional
+        Use the Numba kernel for line currents when Numba is installed.
+    """
+
+    def __init__(self, system, groups=('SynGen', 'RenGen'), use_numba=True):
+        self.system = system
+        self.groups = groups
+        self.use_numba = use_numba
+        self.valid = False
+
+        self.nb = 0
+        self.bus_v = None       # addresses of Bus.v in dae.y
+        self.bus_a = None       # addresses of Bus.a in dae.y
+        self.bus1 = None        # positions of Line.bus1
+        self.bus2 = None        # positions of Line.bus2
+        self.ybr = None         # line current operator
+        self.line_u = None      # Line.u the operator was built with
+
+        # generator currents, split by the dae array they reside in
+        self.gen = {'x': None, 'y': None}
+
+    def invalidate(self):
+        """
+        Mark the resolved positions as outdated.
+        """
+        self.valid = False
+
+    def update(self):
+        """
+        Resolve the positions if outdated. Call it at the top of ``pert``.
+        """
+        if self.system.TDS.custom_event:
+            self.valid = False
+        if not self.valid:
+            self.resolve()
+        elif not np.array_equal(self.system.Line.u.v, self.line_u):
+            self.build_line()
+
+    def build_line(self):
+        """
+        Build the line current operator for the current line status.
+        """
+        self.line_u = np.array(self.system.Line.u.v, dtype=float)
+        self.ybr = LineCurrentOperator(self.system, self.bus1, self.bus2,
+                                       use_numba=self.use_numba)
+
+    def resolve(self):
+        """
+        Resolve idx of buses, lines and generators into integer positions.
+        """
+        system = self.system
+        bus = system.Bus
+
+        self.nb = bus.n
+        self.bus_v = np.asarray(bus.v.a, dtype=int)
+        self.bus_a = np.asarray(bus.a.a, dtype=int)
+        self.bus1 = np.asarray(bus.idx2uid(system.Line.bus1.v), dtype=int)
+        self.bus2 = np.asarray(bus.idx2uid(system.Line.bus2.v), dtype=int)
+
+        gen = {'x': ([], [], []), 'y': ([], [], [])}
+        for name in self.groups:
+            for mdl in getattr(system, name).models.values():
+                if mdl.n == 0 or not hasattr(mdl, 'Id'):
+                    continue
+                pos, id_a, iq_a = gen[mdl.Id.v_code]
+                pos.append(bus.idx2uid(mdl.bus.v))
+                id_a.append(mdl.Id.a)
+                iq_a.append(mdl.Iq.a)
+        for code, (pos, id_a, iq_a) in gen.items():
+            if len(pos) == 0:
+                self.gen[code] = None
+                continue
+            self.gen[code] = (np.concatenate(pos).astype(int),
+                              np.concatenate(id_a).astype(int),
+                              np.concatenate(iq_a).astype(int))
+
+        self.build_line()
+        self.valid = True
+
+    def gen_current(self):
+        """
+        Generator current injections ``Id + 1j * Iq`` summed by bus.
+
+        Returns
+        -------
+        np.ndarray
+            Complex vector of length ``nb``.
+        """
+        dae = self.system.dae
+        Id = np.zeros(self.nb)
+        Iq = np.zeros(self.nb)
+        for code, arr in (('x', dae.x), ('y', dae.y)):
+            if self.gen[code] is None:
+                continue
+            pos, id_a, iq_a = self.gen[code]
+            Id += np.bincount(pos, weights=arr[id_a], minlength=self.nb)
+            Iq += np.bincount(pos, weights=arr[iq_a], minlength=self.nb)
+        return Id + 1j * Iq
+
+    def bus_voltage(self):
+        """
+        Bus voltage magnitudes and angles.
+
+        Returns
+        -------
+        tuple of np.ndarray
+            Voltage magnitudes and angles of all buses.
+        """
+        y = self.system.dae.y
+        return y[self.bus_v], y[self.bus_a]
+
+    def line_current(self, out=None):
+        """
+        Line current injections summed by bus.
+
+        Parameters
+        ----------
+        out : np.ndarray, optional
+            Complex output vector of length ``nb``.
+
+        Returns
+        -------
+        np.ndarray
+            Complex vector of length ``nb``.
+        """
+        vm, va = self.bus_voltage()
+        return self.ybr(vm, va, out=out)
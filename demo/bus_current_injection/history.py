@@ -0,0 +1,148 @@
+"""
+Preallocated history recorder for pert files.
+"""
+
+import os
+
+import numpy as np
+
+
+class History:
+    """
+    Row-wise history of a fixed-length vector, recorded once per TDS step.
+
+    Rows are written into a preallocated 2-D buffer, which grows by whole
+    chunks when full, so that ``push`` costs O(1) amortized instead of the
+    O(steps) copy of ``np.append``.
+    When ``path`` is given, the buffer is a raw memory map on disk, which
+    keeps long runs on large cases out of memory.
+
+    Parameters
+    ----------
+    ncol : int
+        Length of the recorded vector, e.g., the number of buses.
+    dtype : data-type, optional
+        Data type of the records. Defaults to complex.
+    capacity : int, optional
+        Number of rows to preallocate, e.g., ``int(tf / tstep) + 1``.
+    chunk : int, optional
+        Minimum number of rows added when the buffer is full. Defaults to
+        ``capacity``. The buffer grows by at least half of its size.
+    path : str, optional
+        File to back the buffer with a memory map.
+
+    Examples
+    --------
+    In the notebook, before ``TDS.run``:
+
+    .. code-block :: python
+
+        ss.Igen = History(ss.Bus.n, dtype=complex)
+
+    In the pert file, at each step:
+
+    .. code-block :: python
+
+        system.Igen.push(Id + 1j * Iq)
+
+    After the simulation, ``ss.Igen.data`` is a view of the recorded rows.
+    """
+
+    def __init__(self, ncol, dtype=complex, capacity=1024, chunk=None,
+                 path=None):
+        self.ncol = int(ncol)
+        self.dtype = np.dtype(dtype)
+        self.chunk = int(chunk or capacity)
+        self.path = path
+        self.n = 0
+        self._buf = self._alloc(max(int(capacity), 1))
+
+    def _alloc(self, nrow):
+        """
+        Allocate a buffer of ``nrow`` rows.
+
+        For a memory-mapped buffer, the backing file is extended in place,
+        so the recorded rows are kept without copying.
+        """
+        if self.path is None:
+            return np.empty((nrow, self.ncol), dtype=self.dtype)
+
+        nbytes = nrow * self.ncol * self.dtype.itemsize
+        mode = 'r+b' if os.path.isfile(self.path) and self.n > 0 else 'w+b'
+        with open(self.path, mode) as f:
+            f.truncate(nbytes)
+        return np.memmap(self.path, dtype=self.dtype, mode='r+',
+                         shape=(nrow, self.ncol))
+
+    def _grow(self):
+        """
+        Extend the buffer by at least one chunk.
+        """
+        nrow = self._buf.shape[0] + max(self.chunk, self._buf.shape[0] // 2)
+        if self.path is None:
+            buf = self._alloc(nrow)
+            buf[:self.n] = self._buf[:self.n]
+            self._buf = buf
+        else:
+            self._buf.flush()
+            self._buf = self._alloc(nrow)
+
+    def push(self, row):
+        """
+        Record one row.
+
+        Parameters
+        ----------
+        row : array-like
+            Vector of length ``ncol``.
+        """
+        if self.n == self._buf.shape[0]:
+            self._grow()
+        self._buf[self.n] = row
+        self.n += 1
+
+    def reset(self):
+        """
+        Discard the recorded rows and keep the allocated buffer.
+        """
+        self.n = 0
+
+    def flush(self):
+        """
+        Write a memory-mapped buffer to disk.
+        """
+        if self.path is not None:
+            self._buf.flush()
+
+    @property
+    def data(self):
+        """
+        View of the recorded rows, with shape ``(n, ncol)``.
+        """
+        return self._buf[:self.n]
+
+    @property
+    def capacity(self):
+        """
+        Number of allocated rows.
+        """
+        return self._buf.shape[0]
+
+    @property
+    def shape(self):
+        return (self.n, self.ncol)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype, copy=False)
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(n={self.n}, ncol={self.ncol}, '
+                f'capacity={self.capacity}, dtype={self.dtype})')
@@ -2,9 +2,6 @@
 A pert file template.
 """
 
-import numpy as np
-from andes.thirdparty.npfunc import safe_div
-
 
 def pert(t, system):
     """
@@ -40,44 +37,10 @@ def pert(t, system):
         System object supplied by the simulator.
 
     """
-    syg = system.SynGen.find_idx(
-        keys='bus', values=system.Bus.idx.v,
-        allow_all=True, default=None, allow_none=True)
-    reg = system.RenGen.find_idx(
-        keys='bus', values=system.Bus.idx.v,
-        allow_all=True, default=None, allow_none=True)
-
-    Id_syg = system.SynGen.get(src='Id', attr='v', idx=syg,
-                               allow_none=True, default=0)
-    Iq_syg = system.SynGen.get(src='Iq', attr='v', idx=syg,
-                               allow_none=True, default=0)
-    Id_reg = system.RenGen.get(src='Id', attr='v', idx=reg,
-                               allow_none=True, default=0)
-    Iq_reg = system.RenGen.get(src='Iq', attr='v', idx=reg,
-                               allow_none=True, default=0)
-    Id = Id_syg + Id_reg
-    Iq = Iq_syg + Iq_reg
-
-    system.Igen = np.append(system.Igen,
-                            np.reshape(Id + 1j * Iq, (1, system.nb)),
-                            axis=0)
-
-    V1v = system.Bus.get(src='v', attr='v', idx=system.Line.bus1.v)
-    V1a = system.Bus.get(src='a', attr='v', idx=system.Line.bus1.v)
-    V1 = V1v * np.exp(1j * V1a * np.pi / 180)
-
-    V2v = system.Bus.get(src='v', attr='v', idx=system.Line.bus2.v)
-    V2a = system.Bus.get(src='a', attr='v', idx=system.Line.bus2.v)
-    V2 = V2v * np.exp(1j * V2a * np.pi / 180)
-
-    r = system.Line.r.v
-    x = system.Line.x.v
-
-    # Calculate the current flowing through the line
-    Iline_through = safe_div(V1 - V2, r + 1j * x)
+    # idx lookups are resolved once and refreshed on topology events
+    cache = system.cache
+    cache.update()
 
-    Iline = system.Cft @ Iline_through
+    system.Igen.push(cache.gen_current())
 
-    system.Iline = np.append(system.Iline,
-                            np.reshape(Iline, (1, system.nb)),
-                            axis=0)
+    system.Iline.push(cache.line_current())
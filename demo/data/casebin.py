@@ -0,0 +1,382 @@
+"""
+Columnar binary case format for ANDES and AMS systems.
+
+A case is written as a folder of ``.npy`` columns, one per model parameter,
+and a ``manifest.json`` with the model order, column dtypes and the tool
+that wrote it. Each column is read with one ``np.load``, so loading a case
+costs the ``System.add`` calls and no text parsing. Neither ANDES nor AMS
+adds devices in bulk, so the devices are still added one at a time, as by
+the xlsx and json readers.
+
+Usage from the command line::
+
+    python casebin.py convert Texas2k_demo.raw Texas2k_demo.cbin --addfile Texas2k_demo.dyr
+    python casebin.py bench ../pflow_benchmark/case_ACTIVSg10k.xlsx --tool ams
+    python casebin.py bench Texas2k_demo.raw,Texas2k_demo.dyr
+    python casebin.py bench --root .. --tool andes
+
+In ``bench``, a case and its addfile are given separated by a comma, and
+``--root`` benchmarks all cases found under a folder.
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+__version__ = 1
+
+_manifest = 'manifest.json'
+
+
+def _tool_of(system):
+    """
+    Name of the package of a system object, 'andes' or 'ams'.
+    """
+    return type(system).__module__.split('.')[0]
+
+
+def _get_tool(tool):
+    """
+    Import the package of a tool.
+    """
+    if tool == 'andes':
+        import andes
+        return andes
+    if tool == 'ams':
+        import ams
+        return ams
+    raise ValueError(f'Unknown tool <{tool}>.')
+
+
+def _encode(values):
+    """
+    Convert a DataFrame column to an array and its kind.
+
+    Columns of one Python type are stored as plain numeric or unicode
+    arrays, which load without pickle. Columns mixing types, such as idx given as
+    both integers and strings, are kept as object arrays.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in 'biuf':
+        return arr, 'num'
+    types = {type(v) for v in values}
+    if types <= {str, np.str_}:
+        return arr.astype(str), 'str'
+    if types <= {int, np.int64, np.int32}:
+        return arr.astype(np.int64), 'int'
+    if types <= {float, int, type(None), np.float64, np.int64}:
+        return np.array([np.nan if v is None else v for v in values],
+                        dtype=float), 'float'
+    return np.array(values, dtype=object), 'obj'
+
+
+def _decode(arr, kind):
+    """
+    Convert a stored array back to a list of Python values.
+    """
+    if kind == 'float':
+        return [None if np.isnan(v) else v for v in arr.tolist()]
+    return arr.tolist()
+
+
+def write(system, path, overwrite=False):
+    """
+    Write the input parameters of a system to a binary case folder.
+
+    Parameters
+    ----------
+    system : andes.system.System or ams.system.System
+        The loaded system.
+    path : str
+        Output folder, by convention with the ``.cbin`` suffix.
+    overwrite : bool, optional
+        Replace an existing folder.
+
+    Returns
+    -------
+    str
+        The output folder.
+    """
+    if os.path.exists(path):
+        if not overwrite:
+            raise FileExistsError(f'<{path}> exists. Use overwrite=True.')
+        shutil.rmtree(path)
+    os.makedirs(path)
+
+    manifest = dict(version=__version__, tool=_tool_of(system), models=[])
+    for name, mdl in system.models.items():
+        if mdl.n == 0:
+            continue
+        df = mdl.cache.df_in
+        cols = []
+        for k, col in enumerate(df.columns):
+            arr, kind = _encode(df[col].tolist())
+            fname = f'{name}.{k}.npy'
+            np.save(os.path.join(path, fname), arr,
+                    allow_pickle=(kind == 'obj'))
+            cols.append(dict(name=col, file=fname, kind=kind))
+        manifest['models'].append(dict(name=name, n=mdl.n, cols=cols))
+
+    with open(os.path.join(path, _manifest), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return path
+
+
+def read(system, path):
+    """
+    Add the devices of a binary case folder to a system.
+
+    Parameters
+    ----------
+    system : andes.system.System or ams.system.System
+        The system object, before ``setup``.
+    path : str
+        Binary case folder.
+
+    Returns
+    -------
+    andes.system.System or ams.system.System
+        The system with the devices added.
+    """
+    with open(os.path.join(path, _manifest)) as f:
+        manifest = json.load(f)
+    if manifest['tool'] != _tool_of(system):
+        logger.warning(f"<{path}> was written by {manifest['tool']} and is "
+                       f"read into a {_tool_of(system)} system.")
+
+    for mdl in manifest['models']:
+        keys, cols = [], []
+        for col in mdl['cols']:
+            arr = np.load(os.path.join(path, col['file']),
+                          allow_pickle=(col['kind'] == 'obj'))
+            keys.append(col['name'])
+            cols.append(_decode(arr, col['kind']))
+        for row in zip(*cols):
+            system.add(mdl['name'], dict(zip(keys, row)))
+    return system
+
+
+def load(path, setup=True, **kwargs):
+    """
+    Load a binary case folder into a new system of the tool that wrote it.
+
+    Parameters
+    ----------
+    path : str
+        Binary case folder.
+    setup : bool, optional
+        Call ``System.setup`` after adding the devices.
+
+    Other Parameters
+    ----------------
+    **kwargs
+        Keyword arguments of the ``System`` constructor, such as
+        ``no_output`` and ``default_config``.
+
+    Returns
+    -------
+    andes.system.System or ams.system.System
+        The loaded system.
+    """
+    with open(os.path.join(path, _manifest)) as f:
+        tool = json.load(f)['tool']
+    system = _get_tool(tool).System(**kwargs)
+    read(system, path)
+    if setup:
+        system.setup()
+    return system
+
+
+def convert(case, path=None, tool='andes', addfile=None, overwrite=False):
+    """
+    Convert a case supported by ``andes.load`` or ``ams.load`` to a binary
+    case folder.
+
+    Parameters
+    ----------
+    case : str
+        Path to the case file.
+    path : str, optional
+        Output folder. Defaults to the case path with the ``.cbin`` suffix.
+    tool : str, optional
+        'andes' or 'ams'.
+    addfile : str, optional
+        Path to the addfile, e.g., the ``.dyr`` of a ``.raw`` case.
+    overwrite : bool, optional
+        Replace an existing folder.
+
+    Returns
+    -------
+    str
+        The output folder.
+    """
+    if path is None:
+        path = os.path.splitext(case)[0] + '.cbin'
+    system = _get_tool(tool).load(case, addfile=addfile, setup=False,
+                                  no_output=True, default_config=True)
+    return write(system, path, overwrite=overwrite)
+
+
+def _is_case(path):
+    """
+    Whether a file is a case: a PSS/E RAW file, a MATPOWER file assigning
+    ``mpc.bus``, or a workbook or JSON file with a ``Bus`` model.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == '.raw':
+            return True
+        if ext == '.m':
+            with open(path, errors='ignore') as f:
+                return re.search(r'^\s*mpc\.bus\s*=\s*\[', f.read(),
+                                 re.M) is not None
+        if ext == '.xlsx':
+            return 'Bus' in pd.ExcelFile(path).sheet_names
+        if ext == '.json':
+            with open(path) as f:
+                data = json.load(f)
+            return isinstance(data, dict) and 'Bus' in data
+    except Exception as e:
+        logger.debug(f'<{path}> skipped: {e}')
+    return False
+
+
+def find_cases(root):
+    """
+    Find the case files under a folder.
+
+    A RAW file is paired with the DYR file of the same name or, failing
+    that, with the only DYR file of its folder. Binary case folders are
+    skipped.
+
+    Parameters
+    ----------
+    root : str
+        Folder to search.
+
+    Returns
+    -------
+    list
+        Case paths, and ``(case, addfile)`` tuples for RAW files with a DYR
+        file, in the input of :py:func:`bench_load`.
+    """
+    cases = []
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs
+                         if not d.endswith('.cbin') and not d.startswith('.'))
+        dyrs = {os.path.splitext(f)[0].lower(): f for f in files
+                if f.lower().endswith('.dyr')}
+        for f in sorted(files):
+            case = os.path.join(folder, f)
+            if not _is_case(case):
+                continue
+            stem, ext = os.path.splitext(f)
+            if ext.lower() != '.raw' or not dyrs:
+                cases.append(case)
+                continue
+            dyr = dyrs.get(stem.lower())
+            if dyr is None and len(dyrs) == 1:
+                dyr = next(iter(dyrs.values()))
+            cases.append(case if dyr is None
+                         else (case, os.path.join(folder, dyr)))
+    return cases
+
+
+def bench_load(cases, tool='andes', repeat=3, setup=False):
+    """
+    Time loading cases from their original format and from the binary case
+    format.
+
+    Cases without a binary case folder beside them are converted first.
+    Cases the tool cannot load, e.g., AMS cases with ``tool='andes'``, are
+    logged and left out.
+
+    Parameters
+    ----------
+    cases : list
+        Case paths, or ``(case, addfile)`` tuples.
+    tool : str, optional
+        'andes' or 'ams'.
+    repeat : int, optional
+        Number of loads of each format; the minimum time is reported.
+    setup : bool, optional
+        Include ``System.setup`` in the timing.
+
+    Returns
+    -------
+    pd.DataFrame
+        Load times in seconds and the speedup, indexed by case name.
+    """
+    pkg = _get_tool(tool)
+    kwargs = dict(setup=setup, no_output=True, default_config=True)
+    out = {}
+    for case in cases:
+        case, addfile = case if isinstance(case, tuple) else (case, None)
+        path = os.path.splitext(case)[0] + '.cbin'
+        t_src, t_bin = np.inf, np.inf
+        try:
+            if not os.path.isdir(path):
+                convert(case, path, tool=tool, addfile=addfile)
+
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                pkg.load(case, addfile=addfile, **kwargs)
+                t_src = min(t_src, time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                load(path, **kwargs)
+                t_bin = min(t_bin, time.perf_counter() - t0)
+        except Exception as e:
+            logger.error(f'<{case}> failed: {e}')
+            continue
+
+        out[os.path.relpath(case)] = dict(source=t_src, cbin=t_bin,
+                                          speedup=t_src / t_bin)
+    return pd.DataFrame.from_dict(out, orient='index')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Binary case format.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_conv = sub.add_parser('convert', help='Convert a case.')
+    p_conv.add_argument('case')
+    p_conv.add_argument('path', nargs='?')
+    p_conv.add_argument('--addfile')
+    p_conv.add_argument('--tool', default='andes', choices=['andes', 'ams'])
+    p_conv.add_argument('--overwrite', action='store_true')
+
+    p_bench = sub.add_parser('bench', help='Time case loading.')
+    p_bench.add_argument('cases', nargs='*')
+    p_bench.add_argument('--root', help='benchmark all cases under a folder')
+    p_bench.add_argument('--tool', default='andes', choices=['andes', 'ams'])
+    p_bench.add_argument('--repeat', type=int, default=3)
+    p_bench.add_argument('--setup', action='store_true')
+
+    args = parser.parse_args()
+    if args.command == 'convert':
+        path = convert(args.case, args.path, tool=args.tool,
+                       addfile=args.addfile, overwrite=args.overwrite)
+        print(f'Written to <{path}>.')
+    else:
+        cases = [tuple(c.split(',', 1)) if ',' in c else c
+                 for c in args.cases]
+        if args.root is not None:
+            cases += find_cases(args.root)
+        if not cases:
+            parser.error('bench needs cases or --root.')
+        print(bench_load(cases, tool=args.tool, repeat=args.repeat,
+                         setup=args.setup).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Tests of the round trip of a case through the binary case format.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import andes
+
+import casebin
+
+
+@pytest.mark.parametrize('kind, values', [
+    ('num', [1.0, 2.5, np.nan]),
+    ('str', ['Bus_1', 'Bus_2']),
+    ('num', [1, 2, 3]),
+    ('float', [1, None, 2.5]),
+    ('obj', [1, 'PV_2', None]),
+])
+def test_encode_decode(kind, values):
+    arr, got = casebin._encode(values)
+    assert got == kind
+    back = casebin._decode(arr, got)
+    assert len(back) == len(values)
+    for b, v in zip(back, values):
+        if v is None:
+            assert b is None
+        elif isinstance(v, float) and np.isnan(v):
+            assert np.isnan(b)
+        else:
+            assert b == v
+            if kind in ('str', 'int', 'obj'):
+                assert type(b) is type(v)
+
+
+@pytest.mark.parametrize('case, addfile', [
+    ('ieee14/ieee14_full.xlsx', None),
+    ('kundur/kundur.raw', 'kundur/kundur_full.dyr'),
+])
+def test_round_trip(tmp_path, case, addfile):
+    kwargs = dict(no_output=True, default_config=True)
+    addfile = addfile and andes.get_case(addfile)
+    ss = andes.load(andes.get_case(case), addfile=addfile, setup=False,
+                    **kwargs)
+    path = casebin.write(ss, str(tmp_path / 'case.cbin'))
+    with pytest.raises(FileExistsError):
+        casebin.write(ss, path)
+
+    sb = casebin.load(path, setup=False, **kwargs)
+    # columns of one numeric kind come back as one dtype, e.g., the mix of
+    # 0 and True of Line.trans of a raw file as integers
+    for name, mdl in ss.models.items():
+        pd.testing.assert_frame_equal(sb.models[name].cache.df_in,
+                                      mdl.cache.df_in, check_dtype=False)
+
+    ss.setup()
+    sb.setup()
+    ss.PFlow.run()
+    sb.PFlow.run()
+    assert sb.PFlow.converged
+    np.testing.assert_allclose(sb.dae.y, ss.dae.y)
@@ -0,0 +1,258 @@
+"""
+Compiled link map for exchanging AMS results with ANDES.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _present(v):
+    """
+    Whether a cell of the link table holds a device idx.
+    """
+    return v is not None and v is not False and not pd.isna(v)
+
+
+class LinkMap:
+    """
+    Vectorized copies of dispatch results into an ANDES system.
+
+    Each channel maps a source vector, e.g., ``pg`` ordered as the
+    ``StaticGen`` of AMS, to one parameter of an ANDES group or model. The
+    lookups of idx, models and uid are done once in ``add``, and kept as
+    integer arrays per ANDES model, so ``send`` is one fancy-indexed copy
+    per model instead of ``set`` calls through the link table.
+
+    Since the uid of the devices do not change between clones of a system,
+    a map compiled on one system can be bound to its clones with ``bind``.
+
+    Parameters
+    ----------
+    sa : andes.system.System
+        The ANDES system, after setup.
+    link : pd.DataFrame, optional
+        The link table of AMS, ``sp.dyn.link``. Needed by ``add_link``.
+
+    Examples
+    --------
+    .. code-block :: python
+
+        lm = LinkMap(sa, sp.dyn.link)
+        lm.add_link('pg', 'StaticGen', 'p0', src_idx=stg)
+        lm.add('pd', 'PQ', 'p0', sp.PQ.idx.v)
+
+        lm.send('pg', sp.DCOPF.pg.v)
+        lm.send('pd', sp.DCOPF.pd.v)
+    """
+
+    def __init__(self, sa, link=None):
+        self.sa = sa
+        self.link = link
+        self.channels = {}
+
+    def bind(self, sa):
+        """
+        Send to another system with the same devices, e.g., a clone.
+        """
+        self.sa = sa
+
+    def add(self, name, group, param, dst_idx, src_idx=None, scale=None):
+        """
+        Compile a channel.
+
+        Parameters
+        ----------
+        name : str
+            Channel name.
+        group : str
+            Name of the ANDES group or model of the destination.
+        param : str
+            Destination parameter.
+        dst_idx : list
+            Destination idx of each element of the channel.
+        src_idx : list, optional
+            Order of the source vectors of ``send``, as idx matched to
+            ``dst_idx``. Defaults to the order of ``dst_idx``.
+        scale : array-like, optional
+            Factor of each element of the channel.
+        """
+        dst_idx = list(dst_idx)
+        n = len(dst_idx)
+        if src_idx is None:
+            src_pos = np.arange(n)
+        else:
+            pos = {idx: k for k, idx in enumerate(src_idx)}
+            src_pos = np.array([pos[idx] for idx in dst_idx], dtype=int)
+        scale = None if scale is None else np.asarray(scale, dtype=float)
+
+        obj = getattr(self.sa, group)
+        if hasattr(obj, 'models'):
+            models = [mdl.class_name for mdl in obj.idx2model(dst_idx)]
+        else:
+            models = [obj.class_name] * n
+        models = np.array(models)
+
+        parts = []
+        for mdl in np.unique(models):
+            sel = np.flatnonzero(models == mdl)
+            uid = getattr(self.sa, mdl).idx2uid([dst_idx[k] for k in sel])
+            parts.append((mdl, np.array(uid, dtype=int), sel))
+        self.channels[name] = dict(param=param, src_pos=src_pos, scale=scale,
+                                   parts=parts, n=n)
+
+    def add_link(self, name, group, param, key='stg_idx', src_idx=None,
+                 scale=None):
+        """
+        Compile a channel to the devices in a column of the link table.
+
+        Rows without a device in column ``key`` are skipped.
+
+        Parameters
+        ----------
+        name : str
+            Channel name.
+        group : str
+            Name of the ANDES group or model of the destination.
+        param : str
+            Destination parameter.
+        key : str, optional
+            Column of the destination idx, e.g., 'gov_idx' or 'dg_idx'.
+        src_idx : list, optional
+            Order of the source vectors as ``stg_idx``. Defaults to the rows
+            of the link table.
+        scale : str, optional
+            Column of the factor, e.g., 'gammap'.
+        """
+        link = self.link
+        rows = np.flatnonzero([_present(v) for v in link[key]])
+        dst_idx = link[key].values[rows]
+        if src_idx is None:
+            src_pos = rows
+        else:
+            pos = {idx: k for k, idx in enumerate(src_idx)}
+            src_pos = np.array([pos[idx] for idx in
+                                link['stg_idx'].values[rows]], dtype=int)
+        factor = None
+        if scale is not None:
+            factor = link[scale].values[rows].astype(float)
+
+        self.add(name, group, param, dst_idx, scale=factor)
+        self.channels[name]['src_pos'] = src_pos
+
+    def rows(self, name):
+        """
+        Positions in the source vectors of the elements of a channel.
+        """
+        return self.channels[name]['src_pos']
+
+    def send(self, name, values, packed=False):
+        """
+        Copy a source vector into the destination parameter.
+
+        Parameters
+        ----------
+        name : str
+            Channel name.
+        values : array-like
+            Source vector, in the order of ``src_idx``.
+        packed : bool, optional
+            ``values`` are already in the order of the channel elements,
+            e.g., after ``values[lm.rows(name)]`` and clipping.
+        """
+        ch = self.channels[name]
+        values = np.asarray(values, dtype=float)
+        if not packed:
+            values = values[ch['src_pos']]
+        if ch['scale'] is not None:
+            values = values * ch['scale']
+        for mdl, uid, sel in ch['parts']:
+            getattr(getattr(self.sa, mdl), ch['param']).v[uid] = values[sel]
+
+
+def bench_handoff(sp, sa, routine='DCOPF', n=20):
+    """
+    Time the handoff of a routine solution to ANDES per dispatch interval,
+    with ``sp.dyn.send`` and with a compiled :py:class:`LinkMap`.
+
+    The channels follow the rules of ``dyn.send`` for the ``map2`` of the
+    routine, which depend on whether TDS of ``sa`` is initialized. Before
+    TDS, each variable goes to its destination, e.g., ``pg`` to
+    ``StaticGen.p0``, ``ug`` to ``StaticGen.u`` and ``vBus`` to ``Bus.v0``,
+    and ``vBus`` also to ``StaticGen.v0`` at the bus of each generator if
+    the routine is AC converted. During TDS, ``StaticGen.u`` and
+    ``Bus.v0`` are skipped, and ``pg`` goes unscaled to ``TurbineGov.pref0``
+    and ``DG.pref0`` instead of ``StaticGen.p0``.
+
+    Parameters
+    ----------
+    sp : ams.System
+        The AMS system, with the routine solved.
+    sa : andes.system.System
+        The linked ANDES system.
+    routine : str, optional
+        Name of the routine. Defaults to 'DCOPF'.
+    n : int, optional
+        Number of repetitions.
+
+    Returns
+    -------
+    pd.Series
+        Mean time per interval in seconds of 'send', 'compile' and
+        'linkmap', and the speedup of the link map over ``dyn.send``.
+    """
+    rtn = sp.routines[routine]
+    stg = rtn.pg.get_all_idxes()
+    is_tds = bool(sa.TDS.initialized)
+    stg_groups = ('StaticGen', 'PV', 'Slack')
+
+    t0 = time.perf_counter()
+    lm = LinkMap(sa, sp.dyn.link)
+    # channel name and routine vector of each channel
+    sends = []
+    for vname, (group, param) in rtn.map2.items():
+        var = getattr(rtn, vname, None)
+        if var is None or getattr(sa, group).n == 0:
+            continue
+        if (group, param) == ('Bus', 'v0'):
+            if is_tds:
+                continue
+            if rtn.converted:
+                bus = var.get_all_idxes()
+                pos = {idx: k for k, idx in enumerate(bus)}
+                stg_bus = sp.StaticGen.get(src='bus', attr='v', idx=stg)
+                lm.add('vgen', 'StaticGen', 'v0', stg)
+                lm.channels['vgen']['src_pos'] = np.array(
+                    [pos[b] for b in stg_bus], dtype=int)
+                sends.append(('vgen', var))
+        elif group in stg_groups and param == 'u' and is_tds:
+            continue
+        elif group in stg_groups and param == 'p0' and is_tds:
+            for name, dev, key in (('gov', 'TurbineGov', 'gov_idx'),
+                                   ('dg', 'DG', 'dg_idx')):
+                if getattr(sa, dev).n:
+                    lm.add_link(name, dev, 'pref0', key=key, src_idx=stg)
+                    sends.append((name, var))
+            continue
+
+        if group in stg_groups:
+            lm.add(vname, group, param, var.get_all_idxes(), src_idx=stg)
+        else:
+            lm.add(vname, group, param, var.get_all_idxes())
+        sends.append((vname, var))
+    t_compile = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        sp.dyn.send(adsys=sa, routine=routine)
+    t_send = (time.perf_counter() - t0) / n
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        for name, var in sends:
+            lm.send(name, var.v)
+    t_lm = (time.perf_counter() - t0) / n
+
+    return pd.Series(dict(send=t_send, compile=t_compile, linkmap=t_lm,
+                          speedup=t_send / t_lm))
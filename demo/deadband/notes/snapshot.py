@@ -0,0 +1,71 @@
+"""
+Snapshot and restore of set-up ANDES systems.
+"""
+
+import dill
+
+from andes.utils.snapshot import load_ss, save_ss
+
+
+class SystemSnapshot:
+    """
+    Serialized copy of a set-up ANDES system that can be cloned cheaply.
+
+    Loading a case from xlsx, adding ``Output`` devices and running
+    ``setup`` are paid once when the snapshot is taken. Each ``clone``
+    then restores an independent system with the models, ``dae`` arrays,
+    Jacobian sparsity and config of the snapshot, so a dispatch loop only
+    sets the setpoints of the interval before ``PFlow`` and ``TDS.init``.
+
+    Parameters
+    ----------
+    system : andes.system.System
+        The system to snapshot.
+    path : str, optional
+        File to keep the snapshot on disk with ``andes.utils.snapshot``.
+        Defaults to keeping it in memory.
+
+    Examples
+    --------
+    .. code-block :: python
+
+        base = andes.load(addfile, setup=False, no_output=True,
+                          default_config=True)
+        base.add('Output', dict(model='GENROU', varname='omega'))
+        base.setup()
+        snap = SystemSnapshot(base)
+
+        for interval in range(96):
+            sa = snap.clone()
+            # set dispatch setpoints, then PFlow and TDS.init
+    """
+
+    def __init__(self, system, path=None):
+        self.path = path
+        self.blob = None
+        if path is None:
+            # compiled solver handles cannot be serialized
+            system.remove_pycapsule()
+            self.blob = dill.dumps(system, recurse=True)
+        else:
+            save_ss(path, system)
+
+    @property
+    def nbytes(self):
+        """
+        Size of the in-memory snapshot in bytes.
+        """
+        return 0 if self.blob is None else len(self.blob)
+
+    def clone(self):
+        """
+        Restore an independent copy of the system.
+
+        Returns
+        -------
+        andes.system.System
+            The restored system.
+        """
+        if self.blob is not None:
+            return dill.loads(self.blob)
+        return load_ss(self.path)
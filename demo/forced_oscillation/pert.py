@@ -2,7 +2,13 @@
 A pert file template.
 """
 
-import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', 'misc'))
+
+from schedule import Schedule  # noqa: E402
 
 
 def pert(t, system):
@@ -39,13 +45,11 @@ def pert(t, system):
         System object supplied by the simulator.
     """
 
-    if t > system.t1 and t < system.t2:
-        v = system.vd * np.sin(2 * np.pi * system.fd * t)
-        system.EXDC2.set(src='vref0', attr='v',
-                         idx=system.exc,
-                         value=system.vref0+v)
-    elif t >= system.t2:
-        # Let's remove the disturbance.
-        system.EXDC2.set(src='vref0', attr='v',
-                         idx=system.exc,
-                         value=system.vref0)
+    # NOTE: the disturbance is compiled into a schedule at the first step,
+    # which then replaces this function, so the later steps outside the
+    # window between ``t1`` and ``t2`` do not set ``vref0``
+    sched = Schedule()
+    sched.add('EXDC2', 'vref0', system.exc, system.t1, system.t2,
+              wave='sine', amp=system.vd, freq=system.fd)
+    sched.attach(system)
+    sched(t, system)
@@ -2,6 +2,14 @@
 A pert file template.
 """
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', 'misc'))
+
+from schedule import Schedule  # noqa: E402
+
 
 def pert(t, system):
     """
@@ -40,16 +48,25 @@ def pert(t, system):
     # NOTE: in this settings, we emulate that the HVDC line act at 10.0s
     # where the sending end converter withdraw 0.1 pu active power and 0.05 pu reactive power
     # the receiving converter output 0.1 pu active power and terminal voltage is 1.0 pu
-    
-    if t > 10.0:
-        # --- pseudo calculation ---
-        pin = 0.1
-        qin = 0.05
-        pout = 0.1
-        vf = 1.0
-
-        # --- set the values ---
-        system.PQ.set(src='Ppf', attr='v', idx='CONS', value=pin)
-        system.PQ.set(src='Qpf', attr='v', idx='CONS', value=qin)
-        system.SynGen.set(src='tm0', attr='v', idx='CONR', value=pout)
-        system.SynGen.set(src='vf', attr='v', idx='CONR', value=vf)
+    # the parameter steps are compiled into a schedule at the first step,
+    # which then replaces this function
+
+    # --- pseudo calculation ---
+    pin = 0.1
+    qin = 0.05
+    pout = 0.1
+    vf = 1.0
+
+    # ``vf`` is an algebraic variable, not a parameter, so it is still set
+    # at every step by a function chained after the schedule
+    def set_vf(t, system):
+        if t > 10.0:
+            system.SynGen.set(src='vf', attr='v', idx='CONR', value=vf)
+
+    # --- schedule the values ---
+    sched = Schedule(pert=set_vf)
+    sched.add('PQ', 'Ppf', 'CONS', 10.0, value=pin)
+    sched.add('PQ', 'Qpf', 'CONS', 10.0, value=qin)
+    sched.add('SynGen', 'tm0', 'CONR', 10.0, value=pout)
+    sched.attach(system)
+    sched(t, system)
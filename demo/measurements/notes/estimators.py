@@ -0,0 +1,486 @@
+"""
+Streaming frequency and ROCOF estimators of a point-on-wave signal.
+"""
+
+import numpy as np
+import pandas as pd
+
+from window import SlidingWindow
+
+ESTIMATORS = {}
+
+
+def register(cls):
+    """
+    Register an estimator class in ``ESTIMATORS`` under ``cls.name``.
+    """
+    ESTIMATORS[cls.name] = cls
+    return cls
+
+
+def _rolling_mean(y, n):
+    """
+    Mean of the latest ``n`` samples at each sample, as ``SlidingWindow.mean``.
+    """
+    cs = np.concatenate(([0.0], np.cumsum(y)))
+    i = np.arange(1, len(y) + 1)
+    s = np.maximum(i - n, 0)
+    return (cs[i] - cs[s]) / (i - s)
+
+
+def _rolling_slope(y, n, dt):
+    """
+    Least-squares slope of the latest ``n`` samples at each sample, as
+    ``SlidingWindow.slope``.
+    """
+    k = np.arange(len(y))
+    cs = np.concatenate(([0.0], np.cumsum(y)))
+    cks = np.concatenate(([0.0], np.cumsum(k * y)))
+    i = k + 1
+    s = np.maximum(i - n, 0)
+    m = (i - s).astype(float)
+    sy = cs[i] - cs[s]
+    sky = cks[i] - cks[s] - s * sy
+    sk = m * (m - 1) / 2
+    skk = (m - 1) * m * (2 * m - 1) / 6
+    den = m * skk - sk * sk
+    out = np.zeros(len(y))
+    np.divide(m * sky - sk * sy, den * dt, out=out, where=den > 0)
+    return out
+
+
+class Estimator:
+    """
+    Base class of the streaming estimators.
+
+    An estimator is fed one sample of the point-on-wave signal per step by
+    ``step``, at a fixed cost per sample, and keeps the latest estimates in
+    ``f`` and ``rocof``. ``batch`` replays a whole record offline.
+
+    Parameters
+    ----------
+    dt : float
+        Sampling time step in seconds.
+    fn : float, optional
+        Rated frequency in Hz.
+    """
+
+    name = None
+
+    def __init__(self, dt, fn=60.0):
+        self.dt = dt
+        self.fn = fn
+        self.f = fn
+        self.rocof = 0.0
+
+    def reset(self):
+        """
+        Reset the estimator to the rated frequency.
+        """
+        self.f = self.fn
+        self.rocof = 0.0
+
+    def step(self, v):
+        """
+        Feed one sample.
+
+        Parameters
+        ----------
+        v : float
+            The point-on-wave sample.
+
+        Returns
+        -------
+        f : float
+            Frequency, Hz.
+        rocof : float
+            Rate of change of frequency, Hz/s.
+        """
+        raise NotImplementedError
+
+    def batch(self, v):
+        """
+        Replay a record of samples from the reset state.
+
+        Parameters
+        ----------
+        v : np.ndarray
+            The point-on-wave samples.
+
+        Returns
+        -------
+        f : np.ndarray
+            Frequency at each sample, Hz.
+        rocof : np.ndarray
+            Rate of change of frequency at each sample, Hz/s.
+        """
+        self.reset()
+        f = np.empty(len(v))
+        rocof = np.empty(len(v))
+        for i, vi in enumerate(v):
+            f[i], rocof[i] = self.step(vi)
+        return f, rocof
+
+
+@register
+class ZeroCrossing(Estimator):
+    """
+    Frequency from the period between upward zero crossings, with the
+    crossing instants interpolated linearly between samples.
+    The estimates are held between crossings.
+    """
+
+    name = 'zc'
+
+    def __init__(self, dt, fn=60.0):
+        super().__init__(dt, fn)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.k = 0              # sample counter
+        self.v0 = 0.0           # previous sample
+        self.tc = None          # instant of the last crossing
+
+    def step(self, v):
+        if self.k > 0 and self.v0 < 0 <= v:
+            tc = (self.k - 1 + self.v0 / (self.v0 - v)) * self.dt
+            if self.tc is not None:
+                period = tc - self.tc
+                f = 1 / period
+                self.rocof = (f - self.f) / period
+                self.f = f
+            self.tc = tc
+        self.v0 = v
+        self.k += 1
+        return self.f, self.rocof
+
+    def batch(self, v):
+        self.reset()
+        v = np.asarray(v, dtype=float)
+        i = np.flatnonzero((v[:-1] < 0) & (v[1:] >= 0)) + 1
+        tc = (i - 1 + v[i - 1] / (v[i - 1] - v[i])) * self.dt
+        period = np.diff(tc)
+        fc = 1 / period
+        rc = np.diff(np.concatenate(([self.fn], fc))) / period
+
+        # hold the estimate from each crossing until the next one
+        pos = np.searchsorted(i[1:], np.arange(len(v)), side='right') - 1
+        f = np.full(len(v), self.fn)
+        rocof = np.zeros(len(v))
+        f[pos >= 0] = fc[pos[pos >= 0]]
+        rocof[pos >= 0] = rc[pos[pos >= 0]]
+        return f, rocof
+
+
+@register
+class PLL(Estimator):
+    """
+    Single-phase PLL with a PI loop filter. The phase detector output is
+    averaged over one rated cycle to reject the double-frequency ripple.
+    ROCOF is the least-squares slope of the frequency over ``nrocof``
+    samples.
+
+    Parameters
+    ----------
+    bw : float, optional
+        Loop bandwidth in Hz.
+    zeta : float, optional
+        Loop damping ratio.
+    vm : float, optional
+        Nominal amplitude of the signal, p.u.
+    nrocof : int, optional
+        ROCOF window in samples. Defaults to six rated cycles.
+    """
+
+    name = 'pll'
+
+    def __init__(self, dt, fn=60.0, bw=5.0, zeta=0.707, vm=1.0, nrocof=None):
+        super().__init__(dt, fn)
+        wn = 2 * np.pi * bw
+        self.kp = 4 * zeta * wn / vm
+        self.ki = 2 * wn ** 2 / vm
+        ncycle = max(int(round(1 / (fn * dt))), 1)
+        self.err = SlidingWindow(ncycle, dt=dt)
+        self.fwin = SlidingWindow(nrocof or 6 * ncycle, dt=dt)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.theta = 0.0
+        self.integ = 0.0
+        self.err.reset()
+        self.fwin.reset()
+
+    def step(self, v):
+        self.err.push(v * np.cos(self.theta))
+        e = self.err.mean()
+        self.integ += self.ki * e * self.dt
+        w = 2 * np.pi * self.fn + self.kp * e + self.integ
+        self.theta = (self.theta + w * self.dt) % (2 * np.pi)
+
+        self.f = w / (2 * np.pi)
+        self.fwin.push(self.f)
+        self.rocof = self.fwin.slope()
+        return self.f, self.rocof
+
+
+@register
+class RecursiveDFT(Estimator):
+    """
+    Recursive (sliding) DFT over one rated cycle. The frequency is the one
+    of the DFT bin plus the rotation rate of the phasor, averaged over one
+    cycle; ROCOF
+    is the least-squares slope of the frequency over ``nrocof`` samples.
+    The phasor is recomputed from the window once per cycle to bound the
+    round-off drift of the recursion.
+
+    Parameters
+    ----------
+    nrocof : int, optional
+        ROCOF window in samples. Defaults to six rated cycles.
+    """
+
+    name = 'rdft'
+
+    def __init__(self, dt, fn=60.0, nrocof=None):
+        super().__init__(dt, fn)
+        self.N = max(int(round(1 / (fn * dt))), 2)
+        self.fr = 1 / (self.N * dt)     # frequency of the DFT bin
+        self.w = np.exp(-2j * np.pi * np.arange(self.N) / self.N)
+        self.win = SlidingWindow(self.N, dt=dt)
+        self.favg = SlidingWindow(self.N, dt=dt)
+        self.fwin = SlidingWindow(nrocof or 6 * self.N, dt=dt)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.k = 0
+        self.X = 0j
+        self.win.reset()
+        self.favg.reset()
+        self.fwin.reset()
+
+    def _phasor(self, v):
+        """
+        Update the phasor with one sample and return the phase increment.
+        """
+        X0 = self.X
+        kw = self.k % self.N
+        self.X += (v - self.win.oldest) * self.w[kw]
+        self.win.push(v)
+        if kw == self.N - 1:
+            # samples in the window are k - N + 1, ..., k
+            self.X = self.win.values() @ self.w
+        self.k += 1
+        if X0 == 0 or self.X == 0:
+            return 0.0
+        return np.angle(self.X * np.conj(X0))
+
+    def step(self, v):
+        dphi = self._phasor(v)
+        self.favg.push(self.fr + dphi / (2 * np.pi * self.dt))
+        self.f = self.favg.mean()
+        self.fwin.push(self.f)
+        self.rocof = self.fwin.slope()
+        return self.f, self.rocof
+
+    def _batch_dphi(self, v):
+        """
+        Phase increments of the phasor for a record of samples.
+        """
+        k = np.arange(len(v))
+        cs = np.concatenate(([0j], np.cumsum(v * self.w[k % self.N])))
+        X = cs[k + 1] - cs[np.maximum(k + 1 - self.N, 0)]
+        X0 = np.concatenate(([0j], X[:-1]))
+        dphi = np.angle(X * np.conj(X0))
+        dphi[(X == 0) | (X0 == 0)] = 0.0
+        return dphi
+
+    def batch(self, v):
+        self.reset()
+        v = np.asarray(v, dtype=float)
+        dphi = self._batch_dphi(v)
+        f = _rolling_mean(self.fr + dphi / (2 * np.pi * self.dt), self.N)
+        rocof = _rolling_slope(f, self.fwin.size, self.dt)
+        return f, rocof
+
+
+@register
+class LeastSquares(RecursiveDFT):
+    """
+    Least-squares fit of the phasor angle of the recursive DFT. The
+    frequency deviation is the slope of the unwrapped angle over ``nfit``
+    samples, and ROCOF is the slope of the frequency over ``nrocof``
+    samples.
+
+    Parameters
+    ----------
+    nfit : int, optional
+        Angle fitting window in samples. Defaults to two rated cycles.
+    nrocof : int, optional
+        ROCOF window in samples. Defaults to six rated cycles.
+    """
+
+    name = 'ls'
+
+    def __init__(self, dt, fn=60.0, nfit=None, nrocof=None):
+        ncycle = max(int(round(1 / (fn * dt))), 2)
+        self.phi = SlidingWindow(nfit or 2 * ncycle, dt=dt)
+        super().__init__(dt, fn, nrocof=nrocof)
+
+    def reset(self):
+        super().reset()
+        self.phi.reset()
+        self.phi0 = 0.0         # unwrapped phasor angle
+
+    def step(self, v):
+        self.phi0 += self._phasor(v)
+        self.phi.push(self.phi0)
+        self.f = self.fr + self.phi.slope() / (2 * np.pi)
+        self.fwin.push(self.f)
+        self.rocof = self.fwin.slope()
+        return self.f, self.rocof
+
+    def batch(self, v):
+        self.reset()
+        v = np.asarray(v, dtype=float)
+        phi = np.cumsum(self._batch_dphi(v))
+        f = self.fr + _rolling_slope(phi, self.phi.size, self.dt) / (2 * np.pi)
+        rocof = _rolling_slope(f, self.fwin.size, self.dt)
+        return f, rocof
+
+
+class EstimatorBank:
+    """
+    A set of estimators fed from the same point-on-wave samples.
+
+    The signal is read once per step by the pert file and passed to all
+    estimators, whose latest estimates are kept in the arrays ``f`` and
+    ``rocof`` in the order of ``methods``.
+
+    Parameters
+    ----------
+    methods : list of str or dict
+        Names of the estimators in ``ESTIMATORS``, or a dict of names to
+        keyword arguments of the estimators.
+    dt : float
+        Sampling time step in seconds.
+    fn : float, optional
+        Rated frequency in Hz.
+
+    Examples
+    --------
+    In the notebook, after ``TDS.init``:
+
+    .. code-block :: python
+
+        ss.est = EstimatorBank(['zc', 'pll', 'rdft', 'ls'],
+                               dt=ss.TDS.config.tstep, fn=ss.config.freq)
+
+    In the pert file, at each step:
+
+    .. code-block :: python
+
+        system.est.step(system.vpow[0])
+        df, f, rocof = system.est.get('pll')
+    """
+
+    def __init__(self, methods, dt, fn=60.0):
+        if not isinstance(methods, dict):
+            methods = {name: {} for name in methods}
+        self.dt = dt
+        self.fn = fn
+        self.methods = list(methods)
+        self.est = [ESTIMATORS[name](dt, fn=fn, **kwargs)
+                    for name, kwargs in methods.items()]
+        self.f = np.full(len(self.est), fn, dtype=float)
+        self.rocof = np.zeros(len(self.est), dtype=float)
+
+    def reset(self):
+        """
+        Reset all estimators.
+        """
+        for est in self.est:
+            est.reset()
+        self.f[:] = self.fn
+        self.rocof[:] = 0.0
+
+    def step(self, v):
+        """
+        Feed one sample to all estimators.
+
+        Parameters
+        ----------
+        v : float
+            The point-on-wave sample.
+        """
+        for i, est in enumerate(self.est):
+            self.f[i], self.rocof[i] = est.step(v)
+
+    def get(self, name):
+        """
+        Latest estimates of one estimator.
+
+        Returns
+        -------
+        df : float
+            Frequency deviation, Hz.
+        f : float
+            Frequency, Hz.
+        rocof : float
+            Rate of change of frequency, Hz/s.
+        """
+        i = self.methods.index(name)
+        return self.f[i] - self.fn, self.f[i], self.rocof[i]
+
+    def batch(self, v):
+        """
+        Replay a record of samples with all estimators.
+
+        Parameters
+        ----------
+        v : np.ndarray
+            The point-on-wave samples.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns ``f_<name>`` and ``rocof_<name>`` of each estimator.
+        """
+        out = {}
+        for name, est in zip(self.methods, self.est):
+            out[f'f_{name}'], out[f'rocof_{name}'] = est.batch(v)
+        return pd.DataFrame(out)
+
+
+def replay(data, methods=('zc', 'pll', 'rdft', 'ls'), fn=60.0,
+           tcol='t', vcol='vpow'):
+    """
+    Replay a recorded point-on-wave signal offline with several estimators.
+
+    Parameters
+    ----------
+    data : pd.DataFrame or str
+        Record, or path to a CSV record, such as ``m0_out.csv``, with
+        uniformly sampled time and point-on-wave columns.
+    methods : list of str or dict, optional
+        Estimators to run, see ``EstimatorBank``.
+    fn : float, optional
+        Rated frequency in Hz.
+    tcol, vcol : str, optional
+        Names of the time and signal columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        The time column and the estimates of each estimator.
+    """
+    if isinstance(data, str):
+        data = pd.read_csv(data)
+    t = data[tcol].to_numpy(dtype=float)
+    dt = float(np.median(np.diff(t)))
+    bank = EstimatorBank(methods, dt=dt, fn=fn)
+    out = bank.batch(data[vcol].to_numpy(dtype=float))
+    out.insert(0, tcol, t)
+    return out
@@ -42,10 +42,7 @@ def pert(t, system):
     Iout = system.ESD1.get(src='Ipcmd_y', attr='v', idx=system.esd1)
     system.Pout[:] = vout * Iout
     # record output data
-    system.out[system.i, :] = np.concatenate(
-        (system.t0, system.df, system.f, system.rocof, system.vpow,
-         system.ue, system.Pin, system.Pout), axis=0)
-    system.i += 1
+    system.rec.record()
 
     # NOTE: in ANDES, PQ.p0 is a parameter and its value can be altered as necessary
     #  When they are set as constant load, their values remain unchanged
@@ -93,10 +90,11 @@ def measure(system, method=0):
     ----------
     system : andes.system.System
         System object supplied by the simulator.
-    method : int, optional
+    method : int or str, optional
         Method to use.
         0 : Baseline, dynamic models in simulation.
-        1 : TBD.
+        str : Name of an estimator in ``system.est``, an
+        ``estimators.EstimatorBank`` fed with the PoW signal.
     
     Returns
     -------
@@ -108,17 +106,14 @@ def measure(system, method=0):
         Rate of change of frequency, Hz/s.
     """
     # --- update buffer ---
-    system.buf[system.nbuf] = system.omega * system.config.freq
-    system.nbuf += 1
-
-    if system.nbuf >= system.buf.shape[0]:
-        # when the buffer is full, use np.roll for efficient shifting
-        system.buf = np.roll(system.buf, -1)
-        system.buf[-1] = system.omega * system.config.freq
-        system.nbuf = system.buf.shape[0] - 1
+    system.buf.push(system.omega[0] * system.config.freq)
 
     if method == 0:
         return m0(system)
+    elif isinstance(method, str):
+        # all estimators in the bank share the same PoW sample
+        system.est.step(system.vpow[0])
+        return system.est.get(method)
     else:
         return m0(system)
 
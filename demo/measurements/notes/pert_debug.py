@@ -42,12 +42,7 @@ def pert(t, system):
     Iout = system.ESD1.get(src='Ipcmd_y', attr='v', idx=system.esd1)
     system.Pout[:] = vout * Iout
     # record output data
-    system.out[system.i, :] = np.concatenate(
-        (system.t0, system.df, system.f, system.rocof, system.vpow,
-         system.ue, system.Pin, system.Pout,
-         system.df2, system.f2, system.rocof2,),
-        axis=0)
-    system.i += 1
+    system.rec.record()
 
     # NOTE: in ANDES, PQ.p0 is a parameter and its value can be altered as necessary
     #  When they are set as constant load, their values remain unchanged
@@ -100,7 +95,7 @@ def measure(system, method=0):
     method : int, optional
         Method to use.
         0 : Baseline, dynamic models in simulation.
-        1 : TBD.
+        1 : Baseline, and the estimator ``system.m1`` of ``system.est``.
     
     Returns
     -------
@@ -118,14 +113,7 @@ def measure(system, method=0):
         Rate of change of frequency, Hz/s (alternative method).
     """
     # --- update buffer ---
-    system.buf[system.nbuf] = system.vpow
-    system.nbuf += 1
-
-    if system.nbuf >= system.buf.shape[0]:
-        # when the buffer is full, use np.roll for efficient shifting
-        system.buf = np.roll(system.buf, -1)
-        system.buf[-1] = system.omega * system.config.freq
-        system.nbuf = system.buf.shape[0] - 1
+    system.buf.push(system.vpow[0])
 
     df, f, rocof = m0(system)
     df2, f2, rocof2 = m1(system)
@@ -162,6 +150,10 @@ def m1(system):
     Measure frequency deviation, frequency, and rate of change of frequency
     using an alternative method.
 
+    The PoW signal is fed once to all estimators of ``system.est``, an
+    ``estimators.EstimatorBank``, and the estimates of the one named by
+    ``system.m1`` are returned.
+
     Parameters
     ----------
     system : andes.system.System
@@ -176,8 +168,6 @@ def m1(system):
     rocof2 : float
         Rate of change of frequency, Hz/s (alternative method).
     """
-    # TODO: implement other methods here
-    f2 = 0
-    df2 = 0
-    rocof2 = 0
+    system.est.step(system.vpow[0])
+    df2, f2, rocof2 = system.est.get(system.m1)
     return df2, f2, rocof2
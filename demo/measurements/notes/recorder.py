@@ -0,0 +1,135 @@
+"""
+Columnar output recorder for pert files.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class Recorder:
+    """
+    Record named scalar signals once per TDS step into preallocated columns.
+
+    Signals are registered once with ``add`` as references to the arrays
+    that the pert file updates in place, such as ``system.df``. Each
+    ``record`` then copies one element of each source into its column,
+    without building temporary arrays. The columns double in length when
+    variable stepping overruns the estimated number of rows.
+
+    Parameters
+    ----------
+    nrow : int, optional
+        Estimated number of rows, e.g., ``int(tf / tstep) + 2``.
+    dtype : data-type, optional
+        Data type of the columns.
+
+    Examples
+    --------
+    In the notebook, before ``TDS.run``:
+
+    .. code-block :: python
+
+        ss.rec = Recorder(int(ss.TDS.config.tf / ss.TDS.config.tstep) + 2)
+        ss.rec.add('t', ss.t0)
+        ss.rec.add('df', ss.df)
+
+    In the pert file, at each step:
+
+    .. code-block :: python
+
+        system.rec.record()
+    """
+
+    def __init__(self, nrow=1024, dtype=float):
+        self.nrow = max(int(nrow), 1)
+        self.dtype = np.dtype(dtype)
+        self.n = 0
+        self.names = []
+        self.cols = []
+        self._src = []
+
+    def add(self, name, src, idx=0):
+        """
+        Register a signal.
+
+        Parameters
+        ----------
+        name : str
+            Column name.
+        src : np.ndarray
+            Array updated in place by the pert file.
+        idx : int, optional
+            Position of the recorded element in ``src``.
+        """
+        if name in self.names:
+            raise ValueError(f'Signal <{name}> is already registered.')
+        if not isinstance(src, np.ndarray):
+            raise TypeError(f'Source of <{name}> must be an np.ndarray that '
+                            'is updated in place.')
+        col = np.zeros(self.nrow, dtype=self.dtype)
+        self.names.append(name)
+        self.cols.append(col)
+        self._src.append((src.reshape(-1), idx))
+
+    def _grow(self):
+        """
+        Double the length of all columns.
+        """
+        self.nrow *= 2
+        for k, col in enumerate(self.cols):
+            new = np.zeros(self.nrow, dtype=self.dtype)
+            new[:self.n] = col[:self.n]
+            self.cols[k] = new
+
+    def record(self):
+        """
+        Record the current value of all signals as one row.
+        """
+        i = self.n
+        if i == self.nrow:
+            self._grow()
+        for col, (src, idx) in zip(self.cols, self._src):
+            col[i] = src[idx]
+        self.n = i + 1
+
+    def reset(self):
+        """
+        Discard the recorded rows and keep the allocated columns.
+        """
+        self.n = 0
+
+    def __getitem__(self, name):
+        """
+        View of the recorded values of a signal.
+        """
+        return self.cols[self.names.index(name)][:self.n]
+
+    def __len__(self):
+        return self.n
+
+    def to_dict(self):
+        """
+        Views of the recorded values of all signals.
+        """
+        return {name: col[:self.n] for name, col in zip(self.names, self.cols)}
+
+    def to_df(self):
+        """
+        Recorded values as a DataFrame.
+        """
+        return pd.DataFrame(self.to_dict())
+
+    def to_npz(self, path, compressed=False):
+        """
+        Export the recorded values to an NPZ file, one array per signal.
+        """
+        save = np.savez_compressed if compressed else np.savez
+        save(path, **self.to_dict())
+
+    def to_parquet(self, path, **kwargs):
+        """
+        Export the recorded values to a Parquet file.
+
+        Requires ``pyarrow`` or ``fastparquet``.
+        """
+        self.to_df().to_parquet(path, index=False, **kwargs)
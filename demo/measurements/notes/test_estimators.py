@@ -0,0 +1,76 @@
+"""
+Tests of the streaming frequency and ROCOF estimators.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from estimators import ESTIMATORS, Estimator, EstimatorBank, replay
+
+dt = 1 / 3840       # 64 samples per rated cycle
+fn = 60.0
+
+
+def chirp(f0, rocof, tf=2.0):
+    """
+    Point-on-wave samples of a signal with a linear frequency ramp.
+    """
+    t = np.arange(int(round(tf / dt))) * dt
+    return t, np.sin(2 * np.pi * (f0 * t + rocof * t ** 2 / 2))
+
+
+def test_registry():
+    assert set(ESTIMATORS) == {'zc', 'pll', 'rdft', 'ls'}
+    for name, cls in ESTIMATORS.items():
+        assert cls.name == name and issubclass(cls, Estimator)
+
+
+@pytest.mark.parametrize('name', ['zc', 'rdft', 'ls'])
+def test_batch_matches_step(name):
+    _, v = chirp(59.7, 0.5, tf=0.5)
+    est = ESTIMATORS[name](dt, fn=fn)
+    f, rocof = est.batch(v)
+    f_step, rocof_step = Estimator.batch(est, v)
+    np.testing.assert_allclose(f, f_step, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(rocof, rocof_step, rtol=0, atol=1e-3)
+
+
+@pytest.mark.parametrize('name', ['zc', 'pll', 'rdft', 'ls'])
+def test_tracks_frequency(name):
+    # off the rated frequency, the single-phase estimates ripple at twice
+    # the frequency, so a ramp is checked on average
+    t, v = chirp(60.2, 0.0)
+    f, rocof = ESTIMATORS[name](dt, fn=fn).batch(v)
+    late = t > 1.0
+    assert np.abs(f[late] - 60.2).max() < 0.03
+    assert abs(rocof[late].mean()) < 0.01
+
+    t, v = chirp(59.5, 1.0)
+    f, rocof = ESTIMATORS[name](dt, fn=fn).batch(v)
+    assert abs((f[late] - 59.5 - t[late]).mean()) < 0.03
+    assert abs(rocof[late].mean() - 1.0) < 0.01
+
+
+def test_bank():
+    t, v = chirp(60.2, 0.0, tf=0.5)
+    bank = EstimatorBank({'zc': {}, 'pll': dict(bw=4.0)}, dt=dt, fn=fn)
+    for vi in v:
+        bank.step(vi)
+    df, f, rocof = bank.get('zc')
+    assert np.isclose(f, 60.2, atol=1e-3) and np.isclose(df, f - fn)
+    assert bank.est[1].kp == ESTIMATORS['pll'](dt, fn=fn, bw=4.0).kp
+
+    out = bank.batch(v)
+    assert list(out.columns) == ['f_zc', 'rocof_zc', 'f_pll', 'rocof_pll']
+    np.testing.assert_allclose(out.iloc[-1][['f_zc', 'f_pll']], bank.f)
+
+    bank.reset()
+    assert (bank.f == fn).all() and (bank.rocof == 0).all()
+
+
+def test_replay():
+    t, v = chirp(60.0, 0.0, tf=0.2)
+    out = replay(pd.DataFrame(dict(t=t, vpow=v)), methods=['rdft'], fn=fn)
+    assert list(out.columns) == ['t', 'f_rdft', 'rocof_rdft']
+    np.testing.assert_allclose(out['f_rdft'].iloc[2 * 64:], fn, atol=1e-6)
@@ -0,0 +1,44 @@
+"""
+Tests of the columnar output recorder.
+"""
+
+import numpy as np
+import pytest
+
+from recorder import Recorder
+
+
+def test_record_and_grow(tmp_path):
+    t = np.zeros(1)
+    f = np.zeros((2, 1))
+    rec = Recorder(nrow=3)
+    rec.add('t', t)
+    rec.add('f1', f, idx=1)
+
+    rows = []
+    for k in range(10):
+        t[0] = 0.1 * k
+        f[1, 0] = 60 + k
+        rec.record()
+        rows.append((t[0], f[1, 0]))
+    assert len(rec) == 10 and rec.nrow == 12
+
+    ref = np.array(rows)
+    np.testing.assert_array_equal(rec['t'], ref[:, 0])
+    np.testing.assert_array_equal(rec.to_df()[['t', 'f1']].values, ref)
+
+    rec.to_npz(tmp_path / 'rec.npz')
+    with np.load(tmp_path / 'rec.npz') as data:
+        np.testing.assert_array_equal(data['f1'], ref[:, 1])
+
+    rec.reset()
+    assert len(rec) == 0 and len(rec.to_df()) == 0 and rec.nrow == 12
+
+
+def test_add_checks():
+    rec = Recorder()
+    rec.add('t', np.zeros(1))
+    with pytest.raises(ValueError):
+        rec.add('t', np.zeros(1))
+    with pytest.raises(TypeError):
+        rec.add('x', 0.0)
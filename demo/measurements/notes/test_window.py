@@ -0,0 +1,39 @@
+"""
+Tests of the sliding window against a list of the latest samples.
+"""
+
+import numpy as np
+
+from window import SlidingWindow
+
+
+def test_matches_list():
+    rng = np.random.default_rng(0)
+    size, dt = 7, 0.01
+    win = SlidingWindow(size, dt=dt)
+    ref = []
+    for value in 60 + rng.normal(size=40):
+        win.push(value)
+        ref = (ref + [value])[-size:]
+
+        y = np.array(ref)
+        np.testing.assert_allclose(win.values(), y)
+        assert win.last == ref[-1]
+        assert win.full == (len(ref) == size)
+        assert win.oldest == (ref[0] if win.full else 0.0)
+        assert np.isclose(win.mean(), y.mean())
+        if len(y) > 1:
+            slope = np.polyfit(np.arange(len(y)) * dt, y, 1)[0]
+            assert np.isclose(win.slope(), slope)
+
+
+def test_reset():
+    win = SlidingWindow(3)
+    for value in range(5):
+        win.push(value)
+    win.reset()
+    assert win.n == 0 and win.mean() == 0.0 and win.slope() == 0.0
+    win.push(2.0)
+    win.push(4.0)
+    np.testing.assert_allclose(win.values(), [2.0, 4.0])
+    assert win.slope() == 2.0
@@ -0,0 +1,205 @@
+"""
+Sliding measurement window for pert files.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class SlidingWindow:
+    """
+    Circular buffer of the latest ``size`` samples of a signal, sampled at a
+    fixed time step.
+
+    Pushing a sample overwrites the oldest one in place and updates the
+    running sums used by ``mean`` and ``slope``, so each step costs O(1)
+    regardless of the window length. The running sums are recomputed once
+    per wrap of the buffer to bound the round-off drift, which keeps the
+    cost O(1) amortized.
+
+    Parameters
+    ----------
+    size : int
+        Window length in samples.
+    dt : float, optional
+        Sampling time step in seconds, used by ``slope``.
+
+    Examples
+    --------
+    In the notebook, after ``TDS.init``:
+
+    .. code-block :: python
+
+        ss.buf = SlidingWindow(1000, dt=ss.TDS.config.tstep)
+
+    In the pert file, at each step:
+
+    .. code-block :: python
+
+        system.buf.push(system.omega[0] * system.config.freq)
+        rocof = system.buf.slope()
+    """
+
+    def __init__(self, size, dt=1.0):
+        self.size = int(size)
+        self.dt = dt
+        self.buf = np.zeros(self.size, dtype=float)
+        self.head = 0           # position of the next sample
+        self.n = 0              # number of valid samples
+
+        self._sy = 0.0          # sum of samples
+        self._sky = 0.0         # sum of samples weighted by age rank
+
+    def push(self, value):
+        """
+        Append one sample, dropping the oldest one if the window is full.
+
+        Parameters
+        ----------
+        value : float
+            The new sample.
+        """
+        value = float(value)
+        n = self.n
+        if n < self.size:
+            self._sky += n * value
+            self._sy += value
+            self.n = n + 1
+        else:
+            old = self.buf[self.head]
+            # ranks of the kept samples decrease by one
+            self._sky += (n - 1) * value - (self._sy - old)
+            self._sy += value - old
+        self.buf[self.head] = value
+        self.head += 1
+        if self.head == self.size:
+            self.head = 0
+            self._resync()
+
+    def _resync(self):
+        """
+        Recompute the running sums from the buffer.
+        """
+        y = self.values()
+        self._sy = float(y.sum())
+        self._sky = float(np.arange(self.n) @ y)
+
+    def reset(self):
+        """
+        Empty the window.
+        """
+        self.head = 0
+        self.n = 0
+        self._sy = 0.0
+        self._sky = 0.0
+
+    @property
+    def full(self):
+        return self.n == self.size
+
+    @property
+    def oldest(self):
+        """
+        The oldest sample, which is dropped by the next push when the window
+        is full. Zero if the window is not full.
+        """
+        if self.n < self.size:
+            return 0.0
+        return self.buf[self.head]
+
+    @property
+    def last(self):
+        """
+        The newest sample.
+        """
+        return self.buf[self.head - 1]
+
+    def values(self):
+        """
+        Samples ordered from the oldest to the newest.
+
+        Returns
+        -------
+        np.ndarray
+            A copy of the valid samples.
+        """
+        if self.n < self.size:
+            return self.buf[:self.n].copy()
+        return np.concatenate((self.buf[self.head:], self.buf[:self.head]))
+
+    def mean(self):
+        """
+        Mean of the samples in the window.
+        """
+        if self.n == 0:
+            return 0.0
+        return self._sy / self.n
+
+    def slope(self):
+        """
+        Least-squares slope of the samples in the window per second.
+
+        For a frequency signal, this is the ROCOF in Hz/s.
+        """
+        n = self.n
+        if n < 2:
+            return 0.0
+        sk = n * (n - 1) / 2
+        skk = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self._sky - sk * self._sy) / (n * skk - sk * sk) / self.dt
+
+
+def bench_window(sizes=(10, 100, 1000, 10000), nstep=20000, dt=0.001):
+    """
+    Time the per-step cost of a sliding window of different sizes, comparing
+    ``SlidingWindow`` against shifting the buffer with ``np.roll``.
+
+    Parameters
+    ----------
+    sizes : tuple of int, optional
+        Window sizes in samples.
+    nstep : int, optional
+        Number of pushed samples per size.
+    dt : float, optional
+        Sampling time step in seconds.
+
+    Returns
+    -------
+    pd.DataFrame
+        Per-step time in microseconds of each method, indexed by size.
+    """
+    signal = 60 + 0.1 * np.sin(2 * np.pi * np.arange(nstep) * dt)
+    res = pd.DataFrame(index=pd.Index(sizes, name='size'),
+                       columns=['roll', 'window', 'window_slope'],
+                       dtype=float)
+    for size in sizes:
+        # --- np.roll, as used by the pert files before ---
+        buf = np.zeros(size)
+        nbuf = 0
+        t0 = time.perf_counter()
+        for value in signal:
+            if nbuf < size:
+                buf[nbuf] = value
+                nbuf += 1
+            else:
+                buf = np.roll(buf, -1)
+                buf[-1] = value
+        res.loc[size, 'roll'] = (time.perf_counter() - t0) / nstep * 1e6
+
+        # --- circular buffer ---
+        win = SlidingWindow(size, dt=dt)
+        t0 = time.perf_counter()
+        for value in signal:
+            win.push(value)
+        res.loc[size, 'window'] = (time.perf_counter() - t0) / nstep * 1e6
+
+        # --- circular buffer with the ROCOF estimate ---
+        win.reset()
+        t0 = time.perf_counter()
+        for value in signal:
+            win.push(value)
+            win.slope()
+        res.loc[size, 'window_slope'] = (time.perf_counter() - t0) / nstep * 1e6
+    return res
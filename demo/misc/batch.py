@@ -0,0 +1,268 @@
+"""
+Parallel batch of TDS jobs returning selected channels in shared memory.
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import andes
+
+logger = logging.getLogger(__name__)
+
+# rows allocated per job on top of the fixed-step estimate, for event steps
+_extra_rows = 256
+
+# jobs of the running batch, inherited by the forked workers
+_batch = {}
+
+
+def _build(job):
+    """
+    Load and set up the system of a job, and run the power flow.
+    """
+    case = job['case']
+    if callable(case):
+        ss = case()
+    else:
+        ss = andes.load(case, addfile=job.get('addfile'),
+                        pert=job.get('pert'), setup=False, no_output=True,
+                        default_config=True)
+    for model, param_dict in job.get('add', []):
+        ss.add(model=model, param_dict=param_dict)
+    ss.setup()
+
+    for name, options in job.get('config', {}).items():
+        obj = ss if name == 'system' else getattr(ss, name)
+        for key, value in options.items():
+            setattr(obj.config, key, value)
+    if job.get('post_setup') is not None:
+        job['post_setup'](ss)
+
+    ss.PFlow.run()
+    if job.get('pre_tds') is not None:
+        job['pre_tds'](ss)
+    return ss
+
+
+def _tstep(job, tstep):
+    """
+    Time step of a job, from its TDS config or the batch default.
+    """
+    return job.get('config', {}).get('TDS', {}).get('tstep', tstep)
+
+
+def _columns(ss, channels):
+    """
+    Columns of ``channels`` in ``dae.ts.xy``.
+
+    With ``Output`` devices, only their variables are stored, the states of
+    ``Output.xidx`` followed by the algebraics of ``Output.yidx``.
+    """
+    dae = ss.dae
+    if ss.Output.n:
+        stored = ([dae.x_name[i] for i in ss.Output.xidx]
+                  + [dae.y_name[i] for i in ss.Output.yidx])
+    else:
+        stored = dae.xy_name
+    pos = {name: k for k, name in enumerate(stored)}
+    missing = [ch for ch in channels if ch not in pos]
+    if missing:
+        raise KeyError(f'Channels not in the output: {missing}')
+    if dae.ts.xy.shape[1] != len(stored):
+        raise ValueError(f'Output has {dae.ts.xy.shape[1]} columns, '
+                         f'expected {len(stored)}.')
+    return [pos[ch] for ch in channels]
+
+
+def _run_job(k, shm_name, nrow):
+    """
+    Run job ``k`` in a worker and write its channels into the shared block.
+
+    Returns
+    -------
+    tuple
+        Number of rows written, the exit code, the wall time, and the
+        channels as an array when they do not fit in the shared block.
+    """
+    job = _batch['jobs'][k]
+    channels = _batch['channels']
+    tf = _batch['tf']
+
+    t0 = time.perf_counter()
+    ss = _build(job)
+    ss.TDS.config.tf = job.get('tf', tf)
+    # the block of the job is sized from this step
+    ss.TDS.config.tstep = _tstep(job, _batch['tstep'])
+    ss.TDS.config.no_tqdm = True
+    ss.TDS.run()
+
+    cols = _columns(ss, channels)
+    t = ss.dae.ts.t
+    n = len(t)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray((nrow, len(channels) + 1), dtype=float,
+                         buffer=shm.buf)
+        overflow = None
+        if n <= nrow:
+            out[:n, 0] = t
+            out[:n, 1:] = ss.dae.ts.xy[:, cols]
+        else:
+            overflow = np.column_stack((t, ss.dae.ts.xy[:, cols]))
+        del out
+    finally:
+        shm.close()
+    return n, ss.exit_code, time.perf_counter() - t0, overflow
+
+
+class BatchResult:
+    """
+    Channels of a TDS batch, as views of shared memory blocks.
+
+    ``t[name]`` is the time vector and ``data[name]`` the ``(nt, nch)``
+    channels of job ``name``, in the order of ``channels``. The blocks are
+    freed by ``close``, after which the views must not be used; copy them
+    first to keep them.
+    """
+
+    def __init__(self, channels):
+        self.channels = list(channels)
+        self.t = {}
+        self.data = {}
+        self.exit_code = {}
+        self.wall = {}
+        self._shm = []
+
+    def get(self, name, channel):
+        """
+        Time vector and values of one channel of a job.
+        """
+        return self.t[name], self.data[name][:, self.channels.index(channel)]
+
+    def close(self):
+        """
+        Free the shared memory blocks.
+        """
+        self.t.clear()
+        self.data.clear()
+        for shm in self._shm:
+            try:
+                shm.close()
+            except BufferError:
+                # views still referenced elsewhere keep the mapping alive
+                pass
+            shm.unlink()
+        self._shm = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def run_batch(jobs, channels, tf=20.0, tstep=1/30, n_workers=None):
+    """
+    Run TDS jobs in a process pool and collect selected channels.
+
+    Each job is a dict with the keys:
+
+    - ``name``: name of the job in the result.
+    - ``case``: case path, or a function returning an ANDES system before
+      setup, e.g., built from AMS with ``to_andes``.
+    - ``addfile``, ``pert``: optional, as in ``andes.load``.
+    - ``add``: optional list of ``(model, param_dict)`` added before setup,
+      e.g., ``Alter`` disturbances.
+    - ``config``: optional ``{model or routine: {option: value}}`` set after
+      setup, e.g., ``{'PQ': {'p2p': 1}, 'TDS': {'criteria': 0}}``.
+    - ``post_setup``: optional function of the system called after
+      ``config``, before the power flow.
+    - ``pre_tds``: optional function of the system called after the power
+      flow.
+    - ``tf``: optional end time overriding ``tf``.
+
+    The time step of a job is its ``config['TDS']['tstep']`` if given, and
+    ``tstep`` otherwise.
+
+    Jobs are inherited by the forked workers instead of being pickled, so
+    ``case`` and the hooks can be lambdas or closures over AMS systems.
+    Systems stay in the workers. Each worker writes the time and the
+    ``channels`` of its job into a shared memory block allocated by the
+    parent, and only returns the number of rows.
+
+    Parameters
+    ----------
+    jobs : list of dict
+        The jobs.
+    channels : list of str
+        Variable names in ``dae.xy_name``, e.g., 'omega GENROU 47', and in
+        the variables of the ``Output`` devices if the case has any.
+    tf : float, optional
+        End time of the simulations, s.
+    tstep : float, optional
+        Time step of the simulations, s, also used to size the blocks.
+    n_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs, capped
+        at the number of jobs.
+
+    Returns
+    -------
+    BatchResult
+        The channels of each job.
+    """
+    names = [job.get('name', str(k)) for k, job in enumerate(jobs)]
+    if len(set(names)) != len(names):
+        raise ValueError('Job names must be unique.')
+    if n_workers is None:
+        n_workers = min(os.cpu_count() or 1, len(jobs))
+
+    res = BatchResult(channels)
+    ncol = len(channels) + 1
+    _batch.clear()
+    _batch.update(jobs=jobs, channels=list(channels), tf=tf, tstep=tstep)
+
+    # the blocks are not freed by the garbage collector, so free them if
+    # the batch does not complete
+    try:
+        blocks = []
+        for job in jobs:
+            nrow = (int(np.ceil(job.get('tf', tf) / _tstep(job, tstep)))
+                    + _extra_rows)
+            shm = shared_memory.SharedMemory(create=True,
+                                             size=nrow * ncol * 8)
+            res._shm.append(shm)
+            blocks.append((shm, nrow))
+
+        ctx = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(n_workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_run_job, k, shm.name, nrow)
+                       for k, (shm, nrow) in enumerate(blocks)]
+            for name, fut, (shm, nrow) in zip(names, futures, blocks):
+                try:
+                    n, exit_code, wall, overflow = fut.result()
+                except Exception as e:
+                    logger.error(f'Job <{name}> failed: {e}')
+                    continue
+                if overflow is None:
+                    arr = np.ndarray((nrow, ncol), dtype=float,
+                                     buffer=shm.buf)
+                else:
+                    logger.warning(f'Job <{name}> returned {n} rows, more '
+                                   f'than the {nrow} allocated; copied '
+                                   'instead.')
+                    arr = overflow
+                res.t[name] = arr[:n, 0]
+                res.data[name] = arr[:n, 1:]
+                res.exit_code[name] = exit_code
+                res.wall[name] = wall
+    except BaseException:
+        res.close()
+        raise
+    return res
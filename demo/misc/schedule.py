@@ -0,0 +1,247 @@
+"""
+Time-indexed perturbation schedule for TDS.
+"""
+
+import numpy as np
+
+_waves = {'step': 0, 'ramp': 1, 'sine': 2}
+
+
+class Schedule:
+    """
+    Table of parameter perturbations evaluated by vectorized lookup.
+
+    Each row perturbs one parameter of one device with a waveform between
+    ``t_start`` and ``t_end``. The rows are compiled by ``attach`` into
+    arrays, and the schedule replaces the ``pert`` function of TDS.
+
+    The times of all rows split the simulation into segments. At each step,
+    the schedule finds the segment of ``t`` with one ``searchsorted``; if
+    the segment did not change and no ramp or sine is active in it, the
+    step returns without touching the system. Otherwise the offsets of all
+    rows are computed at once, summed per device, and written with one
+    fancy-indexed assignment per model and parameter.
+
+    Parameters
+    ----------
+    pert : callable, optional
+        A ``pert(t, system)`` function called after the schedule at each
+        step, for logic the schedule cannot express.
+
+    Examples
+    --------
+    .. code-block :: python
+
+        sched = Schedule()
+        sched.add('EXDC2', 'vref0', 2, 1, 5, wave='sine', amp=0.3, freq=0.64)
+        sched.add('PQ', 'Ppf', 'CONS', 10, value=0.1)
+
+        ss.TDS.init()
+        sched.attach(ss)
+        ss.TDS.run()
+    """
+
+    def __init__(self, pert=None):
+        self.rows = []
+        self.pert = pert
+        self.system = None
+
+    def add(self, model, param, idx, t_start, t_end=np.inf, wave='step',
+            amp=0.0, freq=0.0, phase=0.0, value=None, hold=None,
+            event=False):
+        """
+        Add a perturbation.
+
+        The parameter is its value at ``attach`` plus the sum of the
+        offsets of its active rows. Within ``[t_start, t_end)``, the offset
+        of a row is ``amp`` for 'step', rises linearly from 0 to ``amp``
+        for 'ramp', and is ``amp * sin(2 pi freq t + phase)`` for 'sine'.
+
+        Only parameters and services, which keep the value written to them,
+        are valid targets. Variables such as ``SynGen.vf`` are overwritten
+        by the solver, so set them in the chained ``pert`` instead.
+
+        Unlike a ``set`` at every step of a ``pert`` function, a step is
+        written once, when ``t`` enters its segment, and a later change of
+        the parameter by other code is not undone, unless a ramp or a sine
+        is active in the segment. A row is active from
+        ``t >= t_start``, where ``if t > t_start`` was often used.
+
+        Parameters
+        ----------
+        model : str
+            Name of the model or group.
+        param : str
+            Name of the parameter, e.g., 'vref0' or 'Ppf'.
+        idx : str, int, or list
+            Device idx.
+        t_start : float
+            Start time, s.
+        t_end : float, optional
+            End time, s. Defaults to the end of the simulation.
+        wave : str, optional
+            'step', 'ramp' or 'sine'.
+        amp : float, optional
+            Amplitude of the offset.
+        freq : float, optional
+            Frequency of 'sine', Hz.
+        phase : float, optional
+            Phase of 'sine', rad.
+        value : float, optional
+            Value of the parameter for a 'step', instead of ``amp``.
+        hold : bool, optional
+            Keep the offset at ``t_end`` afterwards instead of removing it.
+            Defaults to True for 'ramp' and False otherwise.
+        event : bool, optional
+            The parameter is a switch, e.g., 'u', and a change of it sets
+            ``TDS.custom_event`` to rebuild the Jacobian.
+        """
+        if wave not in _waves:
+            raise ValueError(f'Unknown waveform <{wave}>.')
+        if value is not None and wave != 'step':
+            raise ValueError('value is only used by step waveforms.')
+        if not t_end > t_start:
+            raise ValueError('t_end must be after t_start.')
+        if wave == 'ramp' and not np.isfinite(t_end):
+            raise ValueError('A ramp needs a finite t_end.')
+        if hold is None:
+            hold = wave == 'ramp'
+        idxes = idx if isinstance(idx, (list, tuple, np.ndarray)) else [idx]
+        for i in idxes:
+            self.rows.append(dict(model=model, param=param, idx=i,
+                                  t_start=float(t_start), t_end=float(t_end),
+                                  wave=_waves[wave], amp=float(amp),
+                                  freq=float(freq), phase=float(phase),
+                                  value=value, hold=bool(hold),
+                                  event=bool(event)))
+
+    def _resolve(self, system, model, idx):
+        """
+        Model name and uid of a device of a model or group.
+        """
+        obj = getattr(system, model)
+        if hasattr(obj, 'models'):
+            mdl = obj.idx2model(idx).class_name
+        else:
+            mdl = obj.class_name
+        return mdl, getattr(system, mdl).idx2uid(idx)
+
+    def attach(self, system):
+        """
+        Compile the rows for a system and set the schedule as its ``pert``.
+
+        Call it after ``TDS.init``, which loads the ``pert`` file of the
+        system, and after setting the parameters the perturbations start
+        from, since the base values are read here.
+        """
+        self.system = system
+        targets = {}
+        target = np.empty(len(self.rows), dtype=int)
+        for k, row in enumerate(self.rows):
+            key = (*self._resolve(system, row['model'], row['idx']),
+                   row['param'])
+            target[k] = targets.setdefault(key, len(targets))
+        keys = list(targets)
+
+        base = np.array([getattr(getattr(system, mdl), param).v[uid]
+                         for mdl, uid, param in keys], dtype=float)
+        self._base = base
+        self._target = target
+        self._ntarget = len(keys)
+
+        # one assignment per model and parameter
+        groups = {}
+        for j, (mdl, uid, param) in enumerate(keys):
+            groups.setdefault((mdl, param), []).append((uid, j))
+        self._groups = [(mdl, param, np.array([u for u, _ in v], dtype=int),
+                         np.array([j for _, j in v], dtype=int))
+                        for (mdl, param), v in groups.items()]
+
+        def col(name, dtype=float):
+            return np.array([row[name] for row in self.rows], dtype=dtype)
+
+        self._ts = col('t_start')
+        self._te = col('t_end')
+        self._wave = col('wave', int)
+        self._freq = col('freq')
+        self._phase = col('phase')
+        self._hold = col('hold', bool)
+        amp = col('amp')
+        for k, row in enumerate(self.rows):
+            if row['value'] is not None:
+                amp[k] = row['value'] - base[target[k]]
+        self._amp = amp
+
+        self._event = np.zeros(len(keys), dtype=bool)
+        np.logical_or.at(self._event, target, col('event', bool))
+
+        # segments between the times of the rows, and whether a ramp or a
+        # sine is active in each of them
+        self._bp = np.unique(np.concatenate((self._ts, self._te)))
+        left = np.concatenate(([-np.inf], self._bp))
+        right = np.concatenate((self._bp, [np.inf]))
+        with np.errstate(invalid='ignore'):
+            mid = np.where(np.isinf(left), right - 1.0,
+                           np.where(np.isinf(right), left + 1.0,
+                                    (left + right) / 2))
+        live = ((self._ts[None, :] <= mid[:, None])
+                & (mid[:, None] < self._te[None, :])
+                & (self._wave[None, :] != _waves['step']))
+        self._dyn = live.any(axis=1)
+        self._seg = -1
+        self._value = base.copy()
+
+        system.TDS.callpert = self
+        return self
+
+    def offsets(self, t):
+        """
+        Offset of each row at time ``t``.
+        """
+        ts, te, amp = self._ts, self._te, self._amp
+        # rows after their end are evaluated at the end, then kept if held
+        tc = np.minimum(t, te)
+        wave = self._wave
+        ramp = wave == _waves['ramp']
+        off = amp.copy()
+        if ramp.any():
+            frac = (tc[ramp] - ts[ramp]) / (te[ramp] - ts[ramp])
+            off[ramp] = amp[ramp] * frac
+        sine = wave == _waves['sine']
+        if sine.any():
+            off[sine] = amp[sine] * np.sin(2 * np.pi * self._freq[sine]
+                                           * tc[sine] + self._phase[sine])
+        active = (ts <= t) & ((t < te) | self._hold)
+        return np.where(active, off, 0.0)
+
+    def values(self, t):
+        """
+        Value of each perturbed parameter at time ``t``.
+        """
+        return self._base + np.bincount(self._target, weights=self.offsets(t),
+                                        minlength=self._ntarget)
+
+    def __call__(self, t, system):
+        seg = int(np.searchsorted(self._bp, t, side='right'))
+        if seg != self._seg or self._dyn[seg]:
+            self._seg = seg
+            value = self.values(t)
+            if self._event.any():
+                changed = self._event & (value != self._value)
+                if changed.any():
+                    system.TDS.custom_event = True
+            self._value = value
+            for mdl, param, uid, j in self._groups:
+                getattr(getattr(system, mdl), param).v[uid] = value[j]
+        if self.pert is not None:
+            self.pert(t, system)
+
+    def restore(self):
+        """
+        Write the base values back to the system.
+        """
+        system = self.system
+        for mdl, param, uid, j in self._groups:
+            getattr(getattr(system, mdl), param).v[uid] = self._base[j]
+        self._value = self._base.copy()
+        self._seg = -1
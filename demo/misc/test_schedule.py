@@ -0,0 +1,134 @@
+"""
+Tests of the perturbation schedule against a per-step evaluation.
+"""
+
+import numpy as np
+import pytest
+
+import andes
+
+from schedule import Schedule
+
+
+@pytest.fixture(scope='module')
+def system():
+    return andes.load(andes.get_case('ieee14/ieee14_full.xlsx'),
+                      setup=True, no_output=True, default_config=True)
+
+
+def naive(rows, base, t):
+    """
+    Values of the perturbed parameters at ``t``, one row at a time.
+    """
+    value = dict(base)
+    for r in rows:
+        if t < r['t_start'] or (t >= r['t_end'] and not r['hold']):
+            continue
+        tc = min(t, r['t_end'])
+        if r['wave'] == 'step':
+            if r['value'] is None:
+                off = r['amp']
+            else:
+                off = r['value'] - base[r['key']]
+        elif r['wave'] == 'ramp':
+            off = r['amp'] * (tc - r['t_start']) / (r['t_end'] - r['t_start'])
+        else:
+            off = r['amp'] * np.sin(2 * np.pi * r['freq'] * tc + r['phase'])
+        value[r['key']] += off
+    return value
+
+
+def make(system):
+    """
+    A schedule with overlapping rows, and the same rows for ``naive``.
+    """
+    pq = system.PQ.idx.v
+    gen = system.StaticGen.get_all_idxes()
+    rows = [
+        dict(key=('PQ', 'p0', pq[0]), wave='step', t_start=1.0,
+             t_end=np.inf, amp=0.1),
+        dict(key=('PQ', 'p0', pq[0]), wave='ramp', t_start=2.0,
+             t_end=4.0, amp=-0.2),
+        dict(key=('PQ', 'p0', pq[0]), wave='sine', t_start=3.0,
+             t_end=6.0, amp=0.05, freq=0.5, phase=0.3),
+        dict(key=('PQ', 'q0', pq[1]), wave='step', t_start=1.5,
+             t_end=5.0, value=0.4),
+        dict(key=('PQ', 'q0', pq[1]), wave='step', t_start=2.5,
+             t_end=3.5, amp=0.02, hold=True),
+        dict(key=('PQ', 'q0', pq[1]), wave='ramp', t_start=4.0,
+             t_end=5.0, amp=0.3, hold=False),
+        dict(key=('StaticGen', 'p0', gen[1]), wave='sine', t_start=0.5,
+             t_end=2.5, amp=0.1, freq=2.0, hold=True),
+    ]
+    sched = Schedule()
+    for r in rows:
+        r.setdefault('freq', 0.0)
+        r.setdefault('phase', 0.0)
+        r.setdefault('amp', 0.0)
+        r.setdefault('value', None)
+        r.setdefault('hold', r['wave'] == 'ramp')
+        model, param, idx = r['key']
+        sched.add(model, param, idx, r['t_start'], r['t_end'],
+                  wave=r['wave'], amp=r['amp'], freq=r['freq'],
+                  phase=r['phase'], value=r['value'], hold=r['hold'])
+    base = {(model, param, idx): getattr(system, model).get(
+                src=param, attr='v', idx=idx)
+            for model, param, idx in (r['key'] for r in rows)}
+    return sched, rows, base
+
+
+def test_values_match_naive(system):
+    sched, rows, base = make(system)
+    sched.attach(system)
+    keys = list(dict.fromkeys(r['key'] for r in rows))
+    times = np.concatenate((np.linspace(0, 7, 141),
+                            [r['t_start'] for r in rows],
+                            [r['t_end'] for r in rows
+                             if np.isfinite(r['t_end'])]))
+    for t in times:
+        ref = naive(rows, base, t)
+        np.testing.assert_allclose(sched.values(t),
+                                   [ref[k] for k in keys], atol=1e-12,
+                                   err_msg=f't = {t}')
+
+
+def test_call_writes_and_restore(system):
+    sched, rows, base = make(system)
+    sched.attach(system)
+    key = rows[3]['key']
+    uid = system.PQ.idx2uid(key[2])
+    try:
+        for t in np.linspace(0, 7, 71):
+            sched(t, system)
+            ref = naive(rows, base, t)
+            for (model, param, idx), v in ref.items():
+                got = getattr(system, model).get(src=param, attr='v', idx=idx)
+                assert np.isclose(got, v), (t, model, param, idx)
+
+        # without a ramp or sine active, a step is written when its segment
+        # is entered, not at every step
+        sched(6.5, system)
+        system.PQ.q0.v[uid] = -1.0
+        sched(6.8, system)
+        assert system.PQ.q0.v[uid] == -1.0
+        # with one, all the parameters are written at every step
+        sched(1.6, system)
+        system.PQ.q0.v[uid] = -1.0
+        sched(1.7, system)
+        assert np.isclose(system.PQ.q0.v[uid], 0.4)
+    finally:
+        sched.restore()
+    for (model, param, idx), v in base.items():
+        assert getattr(system, model).get(src=param, attr='v', idx=idx) == v
+
+
+def test_add_checks():
+    sched = Schedule()
+    with pytest.raises(ValueError):
+        sched.add('PQ', 'p0', 'PQ_1', 1.0, wave='square')
+    with pytest.raises(ValueError):
+        sched.add('PQ', 'p0', 'PQ_1', 1.0, 2.0, wave='ramp', value=0.1)
+    with pytest.raises(ValueError):
+        sched.add('PQ', 'p0', 'PQ_1', 1.0, 1.0)
+    with pytest.raises(ValueError):
+        sched.add('PQ', 'p0', 'PQ_1', 1.0, wave='ramp', amp=0.1)
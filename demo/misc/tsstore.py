@@ -0,0 +1,268 @@
+"""
+Chunked on-disk store of TDS time series.
+
+A store is a folder with ``meta.json`` and one ``.npy`` file per chunk of
+rows. Chunks are kept channel-major, so reading one channel touches one
+contiguous segment per chunk through a memory map.
+"""
+
+import os
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_meta = 'meta.json'
+
+
+class TimeSeriesWriter:
+    """
+    Incremental writer of a time series store.
+
+    Rows are buffered and written one chunk at a time, so the memory held
+    is one chunk whatever the length of the simulation.
+
+    Parameters
+    ----------
+    path : str
+        Store folder. Existing chunks are removed.
+    names : list of str, optional
+        Channel names. If not given, they are set with ``set_names`` before
+        the first row.
+    chunk : int, optional
+        Number of rows per chunk.
+    dtype : data-type, optional
+        Data type of the stored values.
+    """
+
+    def __init__(self, path, names=None, chunk=4096, dtype=float):
+        self.path = path
+        self.names = None
+        self._buf = None
+        self.chunk = int(chunk)
+        self.dtype = np.dtype(dtype)
+        os.makedirs(path, exist_ok=True)
+        for f in os.listdir(path):
+            if f.startswith('chunk_') and f.endswith('.npy'):
+                os.remove(os.path.join(path, f))
+
+        self._n = 0
+        self.nrow = 0
+        self.nchunk = 0
+        if names is None:
+            self._write_meta()
+        else:
+            self.set_names(names)
+
+    def set_names(self, names):
+        """
+        Set the channel names and allocate the buffer.
+        """
+        if self.nrow or self._n:
+            raise ValueError('Names are set before the first row.')
+        self.names = list(names)
+        # row 0 is the time
+        self._buf = np.empty((len(self.names) + 1, self.chunk),
+                             dtype=self.dtype)
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = dict(names=self.names, chunk=self.chunk, nrow=self.nrow,
+                    nchunk=self.nchunk, dtype=self.dtype.str)
+        with open(os.path.join(self.path, _meta), 'w') as f:
+            json.dump(meta, f)
+
+    def append(self, t, values):
+        """
+        Append one row.
+
+        Parameters
+        ----------
+        t : float
+            Time.
+        values : array-like
+            Value of each channel.
+        """
+        self._buf[0, self._n] = t
+        self._buf[1:, self._n] = values
+        self._n += 1
+        if self._n == self.chunk:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rows as a chunk.
+        """
+        if self._n == 0:
+            return
+        fname = os.path.join(self.path, f'chunk_{self.nchunk:05d}.npy')
+        np.save(fname, self._buf[:, :self._n])
+        self.nrow += self._n
+        self.nchunk += 1
+        self._n = 0
+        self._write_meta()
+
+    def close(self):
+        """
+        Write the remaining rows.
+        """
+        self.flush()
+
+
+def attach(system, path, names=None, chunk=4096, keep=False):
+    """
+    Write the TDS output of a system to a store as it is produced.
+
+    ``system.dae.store``, which TDS calls for every saved step, is wrapped
+    to append the step to a :py:class:`TimeSeriesWriter`. As in
+    ``dae.store``, only the variables of the ``Output`` devices are written
+    if the system has any. With ``keep=False``, the original ``dae.store``
+    is not called and ``dae.ts`` stays empty: ``TDS.plt`` has no data, and
+    the output files written at the end of ``TDS.run`` would be empty, so
+    load the system with ``no_output=True`` and read the results from the
+    store.
+
+    The channel names are resolved at the first saved step, once TDS has
+    set up the dynamic variables and those of ``Output``. Call ``close`` of
+    the returned writer after ``TDS.run``, in a ``finally`` block so the
+    last chunk is written if the run fails.
+
+    Parameters
+    ----------
+    system : andes.system.System
+        The system object, after setup.
+    path : str
+        Store folder.
+    names : list of str, optional
+        Names in ``dae.xy_name`` to store, among the variables of the
+        ``Output`` devices if the system has any. Defaults to all stored
+        variables.
+    chunk : int, optional
+        Number of rows per chunk.
+    keep : bool, optional
+        Also keep the steps in ``dae.ts``.
+
+    Returns
+    -------
+    TimeSeriesWriter
+        The writer.
+    """
+    if not keep and not system.files.no_output:
+        logger.warning('TDS output files will be empty with keep=False; '
+                       'load the system with no_output=True.')
+
+    dae = system.dae
+    out = system.Output
+    writer = TimeSeriesWriter(path, chunk=chunk)
+    store = dae.store
+    # columns of the stored variables, resolved at the first step since
+    # TDS.init sets up the dynamic variables and those of Output
+    sel = {}
+
+    def resolve():
+        if out.n:
+            sel['xidx'] = np.array(out.xidx, dtype=int)
+            sel['yidx'] = np.array(out.yidx, dtype=int)
+            xy_name = ([dae.x_name[i] for i in sel['xidx']]
+                       + [dae.y_name[i] for i in sel['yidx']])
+        else:
+            xy_name = dae.xy_name
+        if names is None:
+            sel['cols'] = None
+            writer.set_names(xy_name)
+        else:
+            pos = {name: k for k, name in enumerate(xy_name)}
+            sel['cols'] = np.array([pos[name] for name in names], dtype=int)
+            writer.set_names(names)
+
+    def store_step():
+        if not sel:
+            resolve()
+        if out.n:
+            xy = np.concatenate((dae.x[sel['xidx']], dae.y[sel['yidx']]))
+        else:
+            xy = np.concatenate((dae.x, dae.y))
+        cols = sel['cols']
+        writer.append(float(dae.t), xy if cols is None else xy[cols])
+        if keep:
+            store()
+
+    dae.store = store_step
+    return writer
+
+
+class TimeSeriesStore:
+    """
+    Lazy reader of a time series store.
+
+    Channels are read by name, one at a time or as a list, from memory
+    maps of the chunks.
+
+    Parameters
+    ----------
+    path : str
+        Store folder.
+
+    Examples
+    --------
+    .. code-block :: python
+
+        ts = TimeSeriesStore('./ieee14_full_out')
+        v = ts['v Bus 1']
+        df = ts.to_df([n for n in ts.names if n.startswith('v Bus')])
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, _meta)) as f:
+            meta = json.load(f)
+        self.names = meta['names']
+        self.nrow = meta['nrow']
+        self._pos = {name: k + 1 for k, name in enumerate(self.names)}
+        self._chunks = [os.path.join(path, f'chunk_{k:05d}.npy')
+                        for k in range(meta['nchunk'])]
+
+    def _read(self, rows):
+        out = np.empty((len(rows), self.nrow))
+        i = 0
+        for fname in self._chunks:
+            arr = np.load(fname, mmap_mode='r')
+            n = arr.shape[1]
+            out[:, i:i + n] = arr[rows]
+            i += n
+        return out
+
+    @property
+    def t(self):
+        """
+        Time vector.
+        """
+        return self._read([0])[0]
+
+    def __getitem__(self, name):
+        """
+        Values of a channel, or of a list of channels as rows.
+        """
+        if isinstance(name, str):
+            return self._read([self._pos[name]])[0]
+        return self._read([self._pos[n] for n in name])
+
+    def __len__(self):
+        return self.nrow
+
+    def to_df(self, names=None):
+        """
+        Channels as a DataFrame indexed by time.
+
+        Parameters
+        ----------
+        names : list of str, optional
+            Channels to read. Defaults to all.
+        """
+        names = self.names if names is None else list(names)
+        data = self._read([0] + [self._pos[n] for n in names])
+        return pd.DataFrame(data[1:].T, index=pd.Index(data[0], name='Time [s]'),
+                            columns=names)
@@ -0,0 +1,188 @@
+"""
+Rolling-horizon scheduling with AMS multi-period routines.
+"""
+
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class RollingHorizon:
+    """
+    Rolling-horizon scheduler over one compiled UC or ED routine.
+
+    The routine is initialized once, with a horizon of as many periods as
+    rows in its time slot model, e.g., ``UCTSlot``. Each window then only
+    writes the load factors of the window into the time slot model, carries
+    the state of the last implemented period into the initial generation
+    ``pg0`` and, for UC, the initial commitment ``ug``, and calls
+    ``update`` on those parameters before ``run``. With DPP, this reuses the
+    compiled problem instead of rebuilding it.
+
+    The solution of the previous window, shifted by ``step`` periods, is set
+    as the initial value of the variables, so that ``run`` with
+    ``warm_start=True`` starts the MIP from a feasible commitment.
+
+    Parameters
+    ----------
+    system : ams.System
+        The system object, after setup.
+    routine : str, optional
+        'UC' or 'ED'.
+    step : int, optional
+        Number of periods implemented per window.
+
+    Examples
+    --------
+    .. code-block :: python
+
+        rh = RollingHorizon(sp, routine='UC', step=4)
+        perf = rh.run(sd, solver='GUROBI')
+        rh.ugd  # implemented commitment over the whole profile
+    """
+
+    def __init__(self, system, routine='UC', step=1):
+        self.system = system
+        self.rtn = system.routines[routine]
+        self.slot = getattr(system, self.rtn.sd.model)
+        self.horizon = self.slot.n
+        if not 0 < step <= self.horizon:
+            raise ValueError(f'step must be within 1 and {self.horizon}.')
+        self.step = step
+        self.commit = hasattr(self.rtn, 'ugd')
+
+        self.pg = None
+        self.ugd = None
+
+    def _carry(self, k):
+        """
+        Set the initial state of the next window from period ``k`` of the
+        solved window.
+        """
+        gen = self.rtn.pg.get_all_idxes()
+        self.system.StaticGen.set(src='pg0', attr='v', idx=gen,
+                                  value=self.rtn.pg.v[:, k])
+        params = ['pg0']
+        if self.commit:
+            self.system.StaticGen.set(src='u', attr='v', idx=gen,
+                                      value=np.round(self.rtn.ugd.v[:, k]))
+            params.append('ug')
+        return params
+
+    def _build(self):
+        """
+        Parse, evaluate and finalize the routine from scratch.
+        """
+        om = self.rtn.om
+        om.parse(force=True)
+        om.evaluate(force=True)
+        om.finalize(force=True)
+        self.rtn.init()
+
+    def _shift_start(self):
+        """
+        Shift the solution by ``step`` periods as the warm start of the next
+        window, repeating the last period.
+        """
+        for var in ('pg', 'ugd', 'vgd', 'wgd', 'zug'):
+            var = getattr(self.rtn, var, None)
+            if var is None or var.optz is None or var.optz.value is None:
+                continue
+            v = var.optz.value
+            if v.ndim < 2:
+                continue
+            shifted = np.hstack((v[:, self.step:],
+                                 np.repeat(v[:, -1:], self.step, axis=1)))
+            var.optz.value = shifted
+
+    def run(self, sd, rebuild=False, warm_start=True, **kwargs):
+        """
+        Run the windows over a load factor profile.
+
+        Parameters
+        ----------
+        sd : array-like
+            Load factors with one row per period, in the layout of the
+            ``sd`` of the time slot model. It needs at least as many rows as
+            the horizon.
+        rebuild : bool, optional
+            Re-initialize the routine in each window, as a reference for
+            the timing.
+        warm_start : bool, optional
+            Start each window from the shifted previous solution.
+
+        Other Parameters
+        ----------------
+        **kwargs
+            Keyword arguments of the routine ``run``, such as ``solver``.
+
+        Returns
+        -------
+        pd.DataFrame
+            Start period, wall time, solve time, objective and convergence
+            of each window.
+        """
+        sd = np.asarray(sd, dtype=float)
+        if sd.ndim == 1:
+            sd = sd[:, None]
+        nper = sd.shape[0]
+        if nper < self.horizon:
+            raise ValueError(f'Profile of {nper} periods is shorter than the '
+                             f'horizon of {self.horizon}.')
+        starts = list(range(0, nper - self.horizon + 1, self.step))
+
+        rtn = self.rtn
+        ng = self.system.StaticGen.n
+        nimp = starts[-1] + self.horizon
+        self.pg = np.full((ng, nimp), np.nan)
+        self.ugd = np.full((ng, nimp), np.nan) if self.commit else None
+
+        # the carried state and the load factors are written to StaticGen
+        # and the time slot model, and restored at the end
+        gen = self.system.StaticGen.get_all_idxes()
+        u0 = self.system.StaticGen.get(src='u', attr='v', idx=gen).copy()
+        pg00 = self.system.StaticGen.get(src='pg0', attr='v', idx=gen).copy()
+        sd0 = self.slot.sd.v.copy()
+
+        rows = []
+        params = []
+        for i, t in enumerate(starts):
+            t0 = time.perf_counter()
+            self.slot.sd.v[:] = sd[t:t + self.horizon].reshape(
+                self.slot.sd.v.shape)
+            if rebuild or not rtn.initialized:
+                self._build()
+            else:
+                rtn.update(['sd'] + params)
+                # the first window has no previous solution to shift
+                if warm_start and i > 0:
+                    self._shift_start()
+            t1 = time.perf_counter()
+            rtn.run(warm_start=warm_start and i > 0 and not rebuild,
+                    **kwargs)
+            t2 = time.perf_counter()
+
+            if not rtn.converged:
+                logger.warning(f'{rtn.class_name} window at period {t} did '
+                               'not converge.')
+
+            # the last window implements all its periods
+            nk = self.horizon if i == len(starts) - 1 else self.step
+            self.pg[:, t:t + nk] = rtn.pg.v[:, :nk]
+            if self.commit:
+                self.ugd[:, t:t + nk] = rtn.ugd.v[:, :nk]
+            params = self._carry(self.step - 1)
+
+            rows.append(dict(start=t, wall=time.perf_counter() - t0,
+                             update=t1 - t0, solve=t2 - t1,
+                             obj=rtn.obj.v, converged=rtn.converged))
+
+        self.system.StaticGen.set(src='u', attr='v', idx=gen, value=u0)
+        self.system.StaticGen.set(src='pg0', attr='v', idx=gen, value=pg00)
+        self.slot.sd.v[:] = sd0
+        rtn.update(['sd', 'pg0'] + (['ug'] if self.commit else []))
+        return pd.DataFrame(rows).set_index('start')